@@ -20,9 +20,10 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    pass
+    # trigram operator classes used by the search indexes
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    pass
+    op.execute("DROP EXTENSION IF EXISTS pg_trgm")
@@ -20,9 +20,27 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    pass
+    # GIN trigram index on extra_metadata::text, the exact expression used by
+    # the ilike (fulltext_search_events) and ~ / ~* (regex_search_events,
+    # search_events_json) filters in app/search.py.
+    # Built CONCURRENTLY so existing tables stay writable during the build.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_events_extra_metadata_trgm",
+            "events",
+            [sa.text("(extra_metadata::text) gin_trgm_ops")],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    pass
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_events_extra_metadata_trgm",
+            table_name="events",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
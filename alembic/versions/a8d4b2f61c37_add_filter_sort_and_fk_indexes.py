@@ -0,0 +1,59 @@
+"""add_filter_sort_and_fk_indexes
+
+Revision ID: a8d4b2f61c37
+Revises: f2c6d8e41b95
+Create Date: 2026-02-05 11:26:40.318552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d4b2f61c37'
+down_revision: Union[str, Sequence[str], None] = 'f2c6d8e41b95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, partial index predicate)
+INDEXES = [
+    # /queries/events_by_city_and_danger: equality on city, danger, range on duration
+    ("ix_events_city_danger_duration", "events", ["city", "danger", "duration"], None),
+    # /queries/sorted_events keyset pages: ORDER BY <field>, id (scanned backwards for desc)
+    ("ix_events_date_id", "events", ["date", "id"], None),
+    ("ix_events_duration_id", "events", ["duration", "id"], None),
+    ("ix_events_city_id", "events", ["city", "id"], None),
+    # FK lookups: joins from events/correspondent and the FK check on their deletes
+    ("ix_reportage_event_id", "reportage", ["event_id"], None),
+    ("ix_reportage_correspondent_id", "reportage", ["correspondent_id"], None),
+    # /queries/increase_operator_prices: WHERE operator AND price >= ?
+    ("ix_correspondent_operator_price", "correspondent", ["price"], "operator"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
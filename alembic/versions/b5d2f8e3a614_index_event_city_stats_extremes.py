@@ -0,0 +1,138 @@
+"""index_event_city_stats_extremes
+
+Revision ID: b5d2f8e3a614
+Revises: e7c1a4f9b2d8
+Create Date: 2026-02-16 15:47:31.206853
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2f8e3a614'
+down_revision: Union[str, Sequence[str], None] = 'e7c1a4f9b2d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# When a removed row held its city's min or max duration, event_city_stats_apply()
+# reads the new extreme from events. The old lookup matched
+# "e.city = o.city OR (o.city = '' AND e.city IS NULL)". The OR kept it off
+# every index, so each such city scanned all of events. Each branch now reads
+# one row from ix_events_city_duration, first in duration order.
+# The UPDATE filter of e7c1a4f9b2d8 is unchanged.
+CITY_DURATION_INDEX = "ix_events_city_duration"
+
+SCAN_EXTREMES = """
+                SELECT min(e.duration) AS min_duration, max(e.duration) AS max_duration
+                FROM events e
+                WHERE e.city = o.city OR (o.city = '' AND e.city IS NULL)"""
+
+
+def _extreme(city, order):
+    return (
+        f"(SELECT e.duration FROM events e WHERE {city} AND e.duration IS NOT NULL "
+        f"ORDER BY e.duration {order} LIMIT 1)"
+    )
+
+
+# '' stands for both '' and NULL cities in event_city_stats
+INDEXED_EXTREMES = f"""
+                SELECT least({_extreme("e.city = o.city", "ASC")},
+                             {_extreme("o.city = '' AND e.city IS NULL", "ASC")}) AS min_duration,
+                       greatest({_extreme("e.city = o.city", "DESC")},
+                                {_extreme("o.city = '' AND e.city IS NULL", "DESC")}) AS max_duration"""
+
+UNCHANGED = (
+    "SELECT * FROM {rows} r WHERE NOT EXISTS ("
+    "SELECT 1 FROM {other} x WHERE x.id = r.id "
+    "AND x.city IS NOT DISTINCT FROM r.city AND x.duration IS NOT DISTINCT FROM r.duration)"
+)
+CHANGED_OLD = f"({UNCHANGED.format(rows='old_rows', other='new_rows')}) AS changed_old"
+CHANGED_NEW = f"({UNCHANGED.format(rows='new_rows', other='old_rows')}) AS changed_new"
+
+
+def _remove(rows, extremes):
+    return f"""
+        UPDATE event_city_stats s SET
+            total_events = s.total_events - d.total_events,
+            duration_count = s.duration_count - d.duration_count,
+            duration_sum = s.duration_sum - d.duration_sum,
+            updated_at = now()
+        FROM (
+            SELECT coalesce(city, '') AS city,
+                   count(*) AS total_events,
+                   count(duration) AS duration_count,
+                   coalesce(sum(duration), 0) AS duration_sum
+            FROM {rows} GROUP BY 1
+        ) d
+        WHERE s.city = d.city;
+
+        UPDATE event_city_stats s SET
+            min_duration = m.min_duration,
+            max_duration = m.max_duration
+        FROM (
+            SELECT o.city, live.min_duration, live.max_duration
+            FROM (
+                SELECT coalesce(city, '') AS city, min(duration) AS min_duration, max(duration) AS max_duration
+                FROM {rows} GROUP BY 1
+            ) o
+            JOIN event_city_stats cur ON cur.city = o.city
+            CROSS JOIN LATERAL ({extremes}
+            ) live
+            WHERE o.min_duration <= cur.min_duration OR o.max_duration >= cur.max_duration
+        ) m
+        WHERE s.city = m.city;
+
+        DELETE FROM event_city_stats WHERE total_events <= 0;"""
+
+
+def _add(rows):
+    return f"""
+        INSERT INTO event_city_stats AS s
+            (city, total_events, duration_count, duration_sum, min_duration, max_duration, updated_at)
+        SELECT coalesce(city, ''), count(*), count(duration), coalesce(sum(duration), 0),
+               min(duration), max(duration), now()
+        FROM {rows} GROUP BY 1
+        ON CONFLICT (city) DO UPDATE SET
+            total_events = s.total_events + EXCLUDED.total_events,
+            duration_count = s.duration_count + EXCLUDED.duration_count,
+            duration_sum = s.duration_sum + EXCLUDED.duration_sum,
+            min_duration = least(s.min_duration, EXCLUDED.min_duration),
+            max_duration = greatest(s.max_duration, EXCLUDED.max_duration),
+            updated_at = now();"""
+
+
+def apply_function(extremes):
+    return f"""
+CREATE OR REPLACE FUNCTION event_city_stats_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN{_add("new_rows")}
+    ELSIF TG_OP = 'DELETE' THEN{_remove("old_rows", extremes)}
+    ELSE{_remove(CHANGED_OLD, extremes)}{_add(CHANGED_NEW)}
+    END IF;
+
+    RETURN NULL;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            CITY_DURATION_INDEX, 'events', ['city', 'duration'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+    op.execute(apply_function(INDEXED_EXTREMES))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(apply_function(SCAN_EXTREMES))
+    with op.get_context().autocommit_block():
+        op.drop_index(CITY_DURATION_INDEX, table_name='events', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,61 @@
+"""add_event_search_vector
+
+Revision ID: b7e2c41d9a53
+Revises: 9f309eed0f84
+Create Date: 2026-01-12 11:20:41.508713
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c41d9a53'
+down_revision: Union[str, Sequence[str], None] = '9f309eed0f84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# same expression as app.models.EVENT_SEARCH_VECTOR at the time of this revision
+EVENT_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(place, '') || ' ' || coalesce(city, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(type, '')), 'B') || "
+    "setweight(jsonb_to_tsvector('english', coalesce(extra_metadata, '{}'::jsonb), '[\"string\"]'), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # stored generated column: Postgres keeps it current on every insert/update
+    # (adding it rewrites the events table once)
+    op.add_column(
+        'events',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(EVENT_SEARCH_VECTOR, persisted=True),
+            nullable=True,
+        )
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_events_search_vector",
+            "events",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_events_search_vector",
+            table_name="events",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('events', 'search_vector')
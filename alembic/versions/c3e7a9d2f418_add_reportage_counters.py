@@ -0,0 +1,116 @@
+"""add_reportage_counters
+
+Revision ID: c3e7a9d2f418
+Revises: a8d4b2f61c37
+Create Date: 2026-02-09 10:41:17.502913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e7a9d2f418'
+down_revision: Union[str, Sequence[str], None] = 'a8d4b2f61c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# per-id deltas of one statement, from whichever transition tables it has;
+# an UPDATE that moves a reportage counts -1 for the old parent, +1 for the new
+DELTAS = {
+    "INSERT": "SELECT {column} AS id, 1 AS n FROM new_rows",
+    "DELETE": "SELECT {column} AS id, -1 AS n FROM old_rows",
+    "UPDATE": "SELECT {column} AS id, 1 AS n FROM new_rows UNION ALL SELECT {column}, -1 FROM old_rows",
+}
+
+
+def _collect(column, prefix):
+    branches = []
+    for operation, rows in DELTAS.items():
+        keyword = "IF" if not branches else "ELSIF"
+        branches.append(f"""
+    {keyword} TG_OP = '{operation}' THEN
+        SELECT array_agg(id ORDER BY id), array_agg(n ORDER BY id) INTO {prefix}_ids, {prefix}_deltas
+        FROM (
+            SELECT id, sum(n) AS n FROM ({rows.format(column=column)}) c
+            WHERE id IS NOT NULL GROUP BY id HAVING sum(n) <> 0
+        ) d;""")
+    return "".join(branches) + "\n    END IF;"
+
+
+def _apply(table, prefix):
+    # lock the parents in id order first, so concurrent bulk writes cannot deadlock
+    return f"""
+    PERFORM 1 FROM {table} WHERE id = ANY({prefix}_ids) ORDER BY id FOR NO KEY UPDATE;
+    UPDATE {table} t SET reportage_count = t.reportage_count + d.n
+    FROM unnest({prefix}_ids, {prefix}_deltas) AS d(id, n)
+    WHERE t.id = d.id;"""
+
+
+# Statement-level like event_city_stats_apply(): a 10k-row bulk insert
+# updates each referenced event/correspondent once.
+APPLY_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION reportage_counts_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    event_ids integer[];
+    event_deltas bigint[];
+    correspondent_ids integer[];
+    correspondent_deltas bigint[];
+BEGIN{_collect("event_id", "event")}{_collect("correspondent_id", "correspondent")}
+{_apply("events", "event")}
+{_apply("correspondent", "correspondent")}
+
+    RETURN NULL;
+END
+$$
+"""
+
+TRIGGERS = {
+    "reportage_counts_insert": "AFTER INSERT ON reportage REFERENCING NEW TABLE AS new_rows",
+    "reportage_counts_update": "AFTER UPDATE ON reportage REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "reportage_counts_delete": "AFTER DELETE ON reportage REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # a constant default is a catalog-only change, no table rewrite
+    op.add_column('events', sa.Column('reportage_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('correspondent', sa.Column('reportage_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(APPLY_FUNCTION)
+    for name, definition in TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} {definition} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION reportage_counts_apply()"
+        )
+
+    # backfill in the same transaction as the triggers, so no change is missed
+    op.execute("LOCK TABLE reportage IN SHARE MODE")
+    for table, column in (("events", "event_id"), ("correspondent", "correspondent_id")):
+        op.execute(f"""
+            UPDATE {table} t SET reportage_count = c.n
+            FROM (SELECT {column} AS id, count(*) AS n FROM reportage GROUP BY 1) c
+            WHERE t.id = c.id
+        """)
+
+    op.create_index('ix_correspondent_reportage_count_id', 'correspondent', ['reportage_count', 'id'])
+    op.create_index(
+        'ix_correspondent_spend_id',
+        'correspondent',
+        [sa.text('(reportage_count * price) DESC NULLS LAST'), sa.text('id DESC')],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_correspondent_spend_id', table_name='correspondent')
+    op.drop_index('ix_correspondent_reportage_count_id', table_name='correspondent')
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON reportage")
+    op.execute("DROP FUNCTION IF EXISTS reportage_counts_apply()")
+    op.drop_column('correspondent', 'reportage_count')
+    op.drop_column('events', 'reportage_count')
@@ -0,0 +1,35 @@
+"""null_unparsable_event_metadata
+
+Revision ID: c8f2a5d7e913
+Revises: b5d2f8e3a614
+Create Date: 2026-02-18 09:36:12.471058
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f2a5d7e913'
+down_revision: Union[str, Sequence[str], None] = 'b5d2f8e3a614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # e5a90b3f7c18 left behind the double-encoded strings that were not valid
+    # JSON. The API rendered them as null; store that, so the read path no
+    # longer has to unwrap anything.
+    op.execute(
+        "UPDATE events SET extra_metadata = NULL "
+        "WHERE jsonb_typeof(extra_metadata) = 'string'"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # the unparsable strings are gone; null reads the same either way
+    pass
@@ -0,0 +1,61 @@
+"""add_metadata_filter_indexes
+
+Revision ID: d31f8a6c2e07
+Revises: b7e2c41d9a53
+Create Date: 2026-01-19 14:02:11.873205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd31f8a6c2e07'
+down_revision: Union[str, Sequence[str], None] = 'b7e2c41d9a53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        # @> containment and @? / @@ jsonpath filters
+        op.create_index(
+            "ix_events_extra_metadata_path_ops",
+            "events",
+            ["extra_metadata"],
+            postgresql_using="gin",
+            postgresql_ops={"extra_metadata": "jsonb_path_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # range filters on attendance; must match app.search.metadata_number()
+        op.create_index(
+            "ix_events_metadata_attendance",
+            "events",
+            [sa.text(
+                "(CASE WHEN jsonb_typeof(extra_metadata -> 'attendance') = 'number' "
+                "THEN (extra_metadata ->> 'attendance')::numeric END)"
+            )],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_events_metadata_attendance",
+            table_name="events",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_events_extra_metadata_path_ops",
+            table_name="events",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
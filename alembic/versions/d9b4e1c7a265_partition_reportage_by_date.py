@@ -0,0 +1,171 @@
+"""partition_reportage_by_date
+
+Revision ID: d9b4e1c7a265
+Revises: c3e7a9d2f418
+Create Date: 2026-02-12 14:05:33.871046
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9b4e1c7a265'
+down_revision: Union[str, Sequence[str], None] = 'c3e7a9d2f418'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# months of empty partitions created ahead of today (app.partitions.PARTITIONS_AHEAD)
+PARTITIONS_AHEAD = 3
+
+# Creates reportage_pYYYY_MM for every month in first_month..last_month that
+# has none. Rows that went to reportage_default for such a month (no
+# partition existed yet) are moved into the new one before it is attached;
+# deleting from the partition directly does not fire the counter triggers of
+# reportage, so the counts are unaffected.
+ENSURE_FUNCTION = """
+CREATE OR REPLACE FUNCTION reportage_ensure_partitions(first_month date, last_month date) RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    month date := date_trunc('month', first_month)::date;
+    next_month date;
+    partition text;
+    created integer := 0;
+BEGIN
+    WHILE month <= last_month LOOP
+        next_month := (month + interval '1 month')::date;
+        partition := 'reportage_p' || to_char(month, 'YYYY_MM');
+        IF to_regclass(partition) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I (LIKE reportage INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition);
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM reportage_default WHERE date >= %L AND date < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved',
+                month, next_month, partition
+            );
+            EXECUTE format(
+                'ALTER TABLE reportage ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                partition, month, next_month
+            );
+            created := created + 1;
+        END IF;
+        month := next_month;
+    END LOOP;
+    RETURN created;
+END
+$$
+"""
+
+COUNTER_TRIGGERS = {
+    "reportage_counts_insert": "AFTER INSERT ON reportage REFERENCING NEW TABLE AS new_rows",
+    "reportage_counts_update": "AFTER UPDATE ON reportage REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "reportage_counts_delete": "AFTER DELETE ON reportage REFERENCING OLD TABLE AS old_rows",
+}
+
+COLUMNS = "id, date, quality, time, video, event_id, correspondent_id"
+
+OLD_INDEXES = ("reportage_pkey", "ix_reportage_id", "ix_reportage_event_id", "ix_reportage_correspondent_id")
+
+
+def create_counter_triggers():
+    for name, definition in COUNTER_TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} {definition} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION reportage_counts_apply()"
+        )
+
+
+def create_fk_indexes():
+    op.create_index('ix_reportage_event_id', 'reportage', ['event_id'])
+    op.create_index('ix_reportage_correspondent_id', 'reportage', ['correspondent_id'])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the partition key is part of the primary key, so it cannot be NULL
+    op.execute("""
+        DO $$
+        DECLARE missing bigint;
+        BEGIN
+            SELECT count(*) INTO missing FROM reportage WHERE date IS NULL;
+            IF missing > 0 THEN
+                RAISE EXCEPTION 'reportage has % rows without a date; set or delete them first', missing;
+            END IF;
+        END
+        $$
+    """)
+
+    # Rewrites the table: reads and writes of reportage wait until commit.
+    op.execute("LOCK TABLE reportage IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE reportage RENAME TO reportage_unpartitioned")
+    for index in OLD_INDEXES:
+        op.execute(f"ALTER INDEX IF EXISTS {index} RENAME TO {index}_unpartitioned")
+
+    op.execute("""
+        CREATE TABLE reportage (
+            id integer NOT NULL DEFAULT nextval('reportage_id_seq'::regclass),
+            date date NOT NULL,
+            quality varchar(50),
+            time time without time zone,
+            video boolean,
+            event_id integer REFERENCES events (id),
+            correspondent_id integer REFERENCES correspondent (id),
+            CONSTRAINT reportage_pkey PRIMARY KEY (id, date)
+        ) PARTITION BY RANGE (date)
+    """)
+    # dates no monthly partition covers yet land here instead of failing the insert
+    op.execute("CREATE TABLE reportage_default PARTITION OF reportage DEFAULT")
+    op.execute(ENSURE_FUNCTION)
+
+    # a partition per month that has data, plus the upcoming ones
+    op.execute("""
+        SELECT reportage_ensure_partitions(month, month)
+        FROM (SELECT DISTINCT date_trunc('month', date)::date AS month FROM reportage_unpartitioned) months
+    """)
+    op.execute(
+        "SELECT reportage_ensure_partitions(current_date, "
+        f"(current_date + interval '{PARTITIONS_AHEAD} months')::date)"
+    )
+
+    op.execute(f"INSERT INTO reportage ({COLUMNS}) SELECT {COLUMNS} FROM reportage_unpartitioned")
+    op.execute("ALTER SEQUENCE reportage_id_seq OWNED BY reportage.id")
+    op.execute("DROP TABLE reportage_unpartitioned")
+
+    # the (id, date) primary key serves id lookups and id order; no separate ix_reportage_id
+    create_fk_indexes()
+    # after the copy, so the counters (already correct) are not added to again
+    create_counter_triggers()
+    op.execute("ANALYZE reportage")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("LOCK TABLE reportage IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE reportage RENAME TO reportage_partitioned")
+    op.execute("ALTER INDEX reportage_pkey RENAME TO reportage_partitioned_pkey")
+    op.execute("ALTER INDEX ix_reportage_event_id RENAME TO ix_reportage_event_id_partitioned")
+    op.execute("ALTER INDEX ix_reportage_correspondent_id RENAME TO ix_reportage_correspondent_id_partitioned")
+
+    op.execute("""
+        CREATE TABLE reportage (
+            id integer NOT NULL DEFAULT nextval('reportage_id_seq'::regclass),
+            date date,
+            quality varchar(50),
+            time time without time zone,
+            video boolean,
+            event_id integer REFERENCES events (id),
+            correspondent_id integer REFERENCES correspondent (id),
+            CONSTRAINT reportage_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute(f"INSERT INTO reportage ({COLUMNS}) SELECT {COLUMNS} FROM reportage_partitioned")
+    op.execute("ALTER SEQUENCE reportage_id_seq OWNED BY reportage.id")
+    # drops every partition with it
+    op.execute("DROP TABLE reportage_partitioned")
+    op.execute("DROP FUNCTION IF EXISTS reportage_ensure_partitions(date, date)")
+
+    op.create_index('ix_reportage_id', 'reportage', ['id'])
+    create_fk_indexes()
+    create_counter_triggers()
+    op.execute("ANALYZE reportage")
@@ -0,0 +1,77 @@
+"""unwrap_event_metadata
+
+Revision ID: e5a90b3f7c18
+Revises: d31f8a6c2e07
+Create Date: 2026-01-26 10:41:37.219664
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a90b3f7c18'
+down_revision: Union[str, Sequence[str], None] = 'd31f8a6c2e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+SELECT_BATCH = sa.text("""
+    SELECT id, extra_metadata #>> '{}' AS raw
+    FROM events
+    WHERE id > :last_id AND jsonb_typeof(extra_metadata) = 'string'
+    ORDER BY id
+    LIMIT :batch_size
+""")
+
+# the typeof guard leaves rows the API rewrote in the meantime untouched
+UPDATE_ROW = sa.text("""
+    UPDATE events SET extra_metadata = CAST(:value AS jsonb)
+    WHERE id = :id AND jsonb_typeof(extra_metadata) = 'string'
+""")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Events used to be written with extra_metadata json.dumps'ed into the
+    # JSONB column, i.e. stored as a JSON string scalar. Replace those with
+    # the object they encode, one committed batch at a time so the table
+    # stays writable. Strings that are not valid JSON are left as they are.
+    if op.get_context().as_sql:
+        # offline (--sql) mode cannot loop over batches: one statement
+        op.execute(
+            "UPDATE events SET extra_metadata = (extra_metadata #>> '{}')::jsonb "
+            "WHERE jsonb_typeof(extra_metadata) = 'string'"
+        )
+        return
+
+    connection = op.get_bind()
+    last_id = 0
+    with op.get_context().autocommit_block():
+        while True:
+            rows = connection.execute(
+                SELECT_BATCH, {"last_id": last_id, "batch_size": BATCH_SIZE}
+            ).all()
+            if not rows:
+                break
+
+            updates = []
+            for row in rows:
+                try:
+                    updates.append({"id": row.id, "value": json.dumps(json.loads(row.raw))})
+                except ValueError:
+                    pass
+
+            if updates:
+                connection.execute(UPDATE_ROW, updates)
+            last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # nothing to undo: the API reads both shapes
+    pass
@@ -0,0 +1,113 @@
+"""skip_unchanged_event_city_stats_updates
+
+Revision ID: e7c1a4f9b2d8
+Revises: d9b4e1c7a265
+Create Date: 2026-02-16 10:22:08.914372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c1a4f9b2d8'
+down_revision: Union[str, Sequence[str], None] = 'd9b4e1c7a265'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The reportage counter triggers UPDATE events on every reportage write, and
+# a statement trigger with transition tables cannot filter on columns. So
+# event_city_stats_apply() itself drops the rows of an UPDATE whose city and
+# duration did not change. A counter-only update then touches no
+# event_city_stats row and takes no lock on it.
+UNCHANGED = (
+    "SELECT * FROM {rows} r WHERE NOT EXISTS ("
+    "SELECT 1 FROM {other} x WHERE x.id = r.id "
+    "AND x.city IS NOT DISTINCT FROM r.city AND x.duration IS NOT DISTINCT FROM r.duration)"
+)
+CHANGED_OLD = f"({UNCHANGED.format(rows='old_rows', other='new_rows')}) AS changed_old"
+CHANGED_NEW = f"({UNCHANGED.format(rows='new_rows', other='old_rows')}) AS changed_new"
+
+
+def _remove(rows):
+    return f"""
+        UPDATE event_city_stats s SET
+            total_events = s.total_events - d.total_events,
+            duration_count = s.duration_count - d.duration_count,
+            duration_sum = s.duration_sum - d.duration_sum,
+            updated_at = now()
+        FROM (
+            SELECT coalesce(city, '') AS city,
+                   count(*) AS total_events,
+                   count(duration) AS duration_count,
+                   coalesce(sum(duration), 0) AS duration_sum
+            FROM {rows} GROUP BY 1
+        ) d
+        WHERE s.city = d.city;
+
+        UPDATE event_city_stats s SET
+            min_duration = m.min_duration,
+            max_duration = m.max_duration
+        FROM (
+            SELECT o.city, live.min_duration, live.max_duration
+            FROM (
+                SELECT coalesce(city, '') AS city, min(duration) AS min_duration, max(duration) AS max_duration
+                FROM {rows} GROUP BY 1
+            ) o
+            JOIN event_city_stats cur ON cur.city = o.city
+            CROSS JOIN LATERAL (
+                SELECT min(e.duration) AS min_duration, max(e.duration) AS max_duration
+                FROM events e
+                WHERE e.city = o.city OR (o.city = '' AND e.city IS NULL)
+            ) live
+            WHERE o.min_duration <= cur.min_duration OR o.max_duration >= cur.max_duration
+        ) m
+        WHERE s.city = m.city;
+
+        DELETE FROM event_city_stats WHERE total_events <= 0;"""
+
+
+def _add(rows):
+    return f"""
+        INSERT INTO event_city_stats AS s
+            (city, total_events, duration_count, duration_sum, min_duration, max_duration, updated_at)
+        SELECT coalesce(city, ''), count(*), count(duration), coalesce(sum(duration), 0),
+               min(duration), max(duration), now()
+        FROM {rows} GROUP BY 1
+        ON CONFLICT (city) DO UPDATE SET
+            total_events = s.total_events + EXCLUDED.total_events,
+            duration_count = s.duration_count + EXCLUDED.duration_count,
+            duration_sum = s.duration_sum + EXCLUDED.duration_sum,
+            min_duration = least(s.min_duration, EXCLUDED.min_duration),
+            max_duration = greatest(s.max_duration, EXCLUDED.max_duration),
+            updated_at = now();"""
+
+
+def apply_function(update_old, update_new):
+    """event_city_stats_apply() taking an UPDATE's rows from update_old / update_new."""
+    return f"""
+CREATE OR REPLACE FUNCTION event_city_stats_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN{_add("new_rows")}
+    ELSIF TG_OP = 'DELETE' THEN{_remove("old_rows")}
+    ELSE{_remove(update_old)}{_add(update_new)}
+    END IF;
+
+    RETURN NULL;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(apply_function(CHANGED_OLD, CHANGED_NEW))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # every updated row counts again, as in f2c6d8e41b95
+    op.execute(apply_function("old_rows", "new_rows"))
@@ -0,0 +1,128 @@
+"""add_event_city_stats
+
+Revision ID: f2c6d8e41b95
+Revises: e5a90b3f7c18
+Create Date: 2026-02-02 09:12:54.640218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c6d8e41b95'
+down_revision: Union[str, Sequence[str], None] = 'e5a90b3f7c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Statement-level triggers: a bulk insert of 10k events upserts one row per
+# city instead of firing 10k row triggers. min/max are only recomputed from
+# events when a removed row held the city's current extreme.
+APPLY_FUNCTION = """
+CREATE OR REPLACE FUNCTION event_city_stats_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE event_city_stats s SET
+            total_events = s.total_events - d.total_events,
+            duration_count = s.duration_count - d.duration_count,
+            duration_sum = s.duration_sum - d.duration_sum,
+            updated_at = now()
+        FROM (
+            SELECT coalesce(city, '') AS city,
+                   count(*) AS total_events,
+                   count(duration) AS duration_count,
+                   coalesce(sum(duration), 0) AS duration_sum
+            FROM old_rows GROUP BY 1
+        ) d
+        WHERE s.city = d.city;
+
+        UPDATE event_city_stats s SET
+            min_duration = m.min_duration,
+            max_duration = m.max_duration
+        FROM (
+            SELECT o.city, live.min_duration, live.max_duration
+            FROM (
+                SELECT coalesce(city, '') AS city, min(duration) AS min_duration, max(duration) AS max_duration
+                FROM old_rows GROUP BY 1
+            ) o
+            JOIN event_city_stats cur ON cur.city = o.city
+            CROSS JOIN LATERAL (
+                SELECT min(e.duration) AS min_duration, max(e.duration) AS max_duration
+                FROM events e
+                WHERE e.city = o.city OR (o.city = '' AND e.city IS NULL)
+            ) live
+            WHERE o.min_duration <= cur.min_duration OR o.max_duration >= cur.max_duration
+        ) m
+        WHERE s.city = m.city;
+
+        DELETE FROM event_city_stats WHERE total_events <= 0;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO event_city_stats AS s
+            (city, total_events, duration_count, duration_sum, min_duration, max_duration, updated_at)
+        SELECT coalesce(city, ''), count(*), count(duration), coalesce(sum(duration), 0),
+               min(duration), max(duration), now()
+        FROM new_rows GROUP BY 1
+        ON CONFLICT (city) DO UPDATE SET
+            total_events = s.total_events + EXCLUDED.total_events,
+            duration_count = s.duration_count + EXCLUDED.duration_count,
+            duration_sum = s.duration_sum + EXCLUDED.duration_sum,
+            min_duration = least(s.min_duration, EXCLUDED.min_duration),
+            max_duration = greatest(s.max_duration, EXCLUDED.max_duration),
+            updated_at = now();
+    END IF;
+
+    RETURN NULL;
+END
+$$
+"""
+
+TRIGGERS = {
+    "events_city_stats_insert": "AFTER INSERT ON events REFERENCING NEW TABLE AS new_rows",
+    "events_city_stats_update": "AFTER UPDATE ON events REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "events_city_stats_delete": "AFTER DELETE ON events REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'event_city_stats',
+        # '' stands for events without a city
+        sa.Column('city', sa.String(length=100), primary_key=True),
+        sa.Column('total_events', sa.BigInteger(), nullable=False),
+        sa.Column('duration_count', sa.BigInteger(), nullable=False),
+        sa.Column('duration_sum', sa.BigInteger(), nullable=False),
+        sa.Column('min_duration', sa.Integer(), nullable=True),
+        sa.Column('max_duration', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+    op.execute(APPLY_FUNCTION)
+    for name, definition in TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} {definition} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION event_city_stats_apply()"
+        )
+
+    # backfill in the same transaction as the triggers, so no change is missed
+    op.execute("LOCK TABLE events IN SHARE MODE")
+    op.execute("""
+        INSERT INTO event_city_stats
+            (city, total_events, duration_count, duration_sum, min_duration, max_duration)
+        SELECT coalesce(city, ''), count(*), count(duration), coalesce(sum(duration), 0),
+               min(duration), max(duration)
+        FROM events GROUP BY 1
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON events")
+    op.execute("DROP FUNCTION IF EXISTS event_city_stats_apply()")
+    op.drop_table('event_city_stats')
@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app import database, models
+from app.cache import response_cache
+from app.counters import reconcile_counters
+from app.partitions import PARTITIONS_AHEAD, ensure_upcoming, list_partitions
+from app.database import get_db
+from app.stats import REBUILD_STATEMENTS
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/pool")
+def get_pool_stats():
+    """Connection pool usage and checkout wait times for each engine"""
+    stats = {
+        "config": database.POOL_OPTIONS,
+        "sync": database.engine.pool.stats.snapshot(database.engine.pool),
+    }
+    if database.async_engine is not None:
+        pool = database.async_engine.sync_engine.pool
+        stats["async"] = pool.stats.snapshot(pool)
+    return stats
+
+
+@router.get("/cache")
+def get_cache_stats():
+    """Response cache size, hit ratio, evictions and invalidations"""
+    return response_cache.snapshot()
+
+
+@router.post("/city_stats/rebuild")
+def rebuild_city_stats(db: Session = Depends(get_db)):
+    """Recompute the event_city_stats rollup from events in one transaction"""
+    for statement in REBUILD_STATEMENTS:
+        db.execute(statement)
+    db.commit()
+    response_cache.invalidate("event_city_stats")
+    cities = db.scalar(select(func.count()).select_from(models.EventCityStats))
+    return {"message": "City stats rebuilt", "cities": cities}
+
+
+@router.post("/reportage_counts/reconcile")
+def reconcile_reportage_counts(db: Session = Depends(get_db)):
+    """Recount reportages per event and correspondent, fixing counters that drifted"""
+    repaired = reconcile_counters(db)
+    db.commit()
+    if any(repaired.values()):
+        response_cache.invalidate("reportage")
+    return {"message": "Reportage counts reconciled", "repaired": {table: len(ids) for table, ids in repaired.items()}}
+
+
+@router.get("/partitions")
+def get_reportage_partitions(db: Session = Depends(get_db)):
+    """Monthly reportage partitions with their date bounds, estimated rows and size"""
+    return list_partitions(db.connection())
+
+
+@router.post("/partitions/ensure")
+def ensure_reportage_partitions(
+    ahead: int = Query(PARTITIONS_AHEAD, ge=0, le=24, description="Months to prepare beyond the current one"),
+    db: Session = Depends(get_db)
+):
+    """Create the missing monthly partitions up to `ahead` months from now"""
+    created = ensure_upcoming(db.connection(), ahead)
+    db.commit()
+    return {"message": "Partitions ready", "created": created}
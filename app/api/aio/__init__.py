@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from fastapi.routing import APIRoute
+
+
+def merge_routers(sync_router: APIRouter, async_router: APIRouter) -> APIRouter:
+    """Replace sync routes with their async counterparts (same path and method).
+
+    Routes that have no async version keep their sync handler, and the
+    declaration order of the sync router is preserved so literal paths
+    still win over `/{id}` ones.
+    """
+    overrides = {
+        (route.path, frozenset(route.methods)): route
+        for route in async_router.routes
+        if isinstance(route, APIRoute)
+    }
+
+    merged = APIRouter()
+    for route in sync_router.routes:
+        if isinstance(route, APIRoute):
+            route = overrides.get((route.path, frozenset(route.methods)), route)
+        merged.routes.append(route)
+    return merged
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.database import get_async_db
+from app import models, schemas
+from app.pagination import keyset_page, set_next_cursor
+from app.cache import response_cache
+from app.serialization import CORRESPONDENT_ROWS, row_dicts, rows_response
+
+router = APIRouter(prefix="/correspondents", tags=["correspondents"])
+
+# CREATE
+@router.post("/", response_model=schemas.CorrespondentResponse)
+async def create_correspondent(
+    correspondent: schemas.CorrespondentCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_correspondent = models.Correspondent(**correspondent.dict())
+    db.add(db_correspondent)
+    await db.commit()
+    await db.refresh(db_correspondent)
+    response_cache.invalidate("correspondent", db_correspondent.id)
+    return db_correspondent
+
+# READ ALL
+@router.get("/", response_model=List[schemas.CorrespondentResponse])
+async def read_correspondents(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    rows = (await db.execute(
+        keyset_page(CORRESPONDENT_ROWS, models.Correspondent.id, cursor, skip, limit)
+    )).all()
+    set_next_cursor(response, rows, limit)
+    return rows_response(row_dicts(rows), response)
+
+# READ ONE
+@router.get("/{correspondent_id}", response_model=schemas.CorrespondentResponse)
+async def read_correspondent(
+    correspondent_id: int, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    lookup = response_cache.lookup(request)
+    if lookup.hit is not None:
+        return lookup.hit
+    correspondent = await db.get(models.Correspondent, correspondent_id)
+    if correspondent is None:
+        raise HTTPException(status_code=404, detail="Correspondent not found")
+    return lookup.store(
+        correspondent, [("correspondent", correspondent_id)], schemas.CorrespondentResponse
+    )
+
+# UPDATE
+@router.put("/{correspondent_id}", response_model=schemas.CorrespondentResponse)
+async def update_correspondent(
+    correspondent_id: int,
+    correspondent_update: schemas.CorrespondentCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_correspondent = await db.get(models.Correspondent, correspondent_id)
+    if db_correspondent is None:
+        raise HTTPException(status_code=404, detail="Correspondent not found")
+
+    for field, value in correspondent_update.dict().items():
+        setattr(db_correspondent, field, value)
+
+    await db.commit()
+    await db.refresh(db_correspondent)
+    response_cache.invalidate("correspondent", correspondent_id)
+    return db_correspondent
+
+# DELETE
+@router.delete("/{correspondent_id}")
+async def delete_correspondent(correspondent_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_correspondent = await db.get(models.Correspondent, correspondent_id)
+    if db_correspondent is None:
+        raise HTTPException(status_code=404, detail="Correspondent not found")
+
+    await db.delete(db_correspondent)
+    await db.commit()
+    response_cache.invalidate("correspondent", correspondent_id)
+    # the ORM set correspondent_id to NULL on its reportages; their ids are not known here
+    response_cache.invalidate_table("reportage")
+    return {"message": "Correspondent deleted"}
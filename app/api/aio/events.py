@@ -0,0 +1,99 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+from app.database import get_async_db
+from app import models, schemas
+from app.schemas import parse_temporal
+from app.pagination import keyset_page, set_next_cursor
+from app.cache import response_cache
+from app.serialization import EVENT_ROWS, row_dicts, rows_response
+from app.export import check_format, events_export, export_response, stream_export_async
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# CREATE
+@router.post("/", response_model=schemas.EventResponse)
+async def create_event(event: schemas.EventCreate, db: AsyncSession = Depends(get_async_db)):
+    db_event = models.Event(**parse_temporal(event.dict()))
+    db.add(db_event)
+    await db.commit()
+    await db.refresh(db_event)
+    response_cache.invalidate("events", db_event.id)
+    return db_event
+
+# READ ALL
+@router.get("/", response_model=List[schemas.EventResponse])
+async def read_events(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    rows = (await db.execute(
+        keyset_page(EVENT_ROWS, models.Event.id, cursor, skip, limit)
+    )).all()
+    set_next_cursor(response, rows, limit)
+    return rows_response(row_dicts(rows), response)
+
+# EXPORT (NDJSON or CSV, streamed; declared before /{event_id})
+@router.get("/export")
+async def export_events(
+    format: str = Query("ndjson", description="ndjson or csv"),
+    gzip: bool = Query(False, description="gzip-compress the stream"),
+    city: Optional[str] = None,
+    danger: Optional[str] = None,
+    type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Stream all matching events from a server-side cursor"""
+    statement = events_export(city, danger, type, date_from, date_to)
+    return export_response(
+        stream_export_async(statement, check_format(format), gzip), format, "events", gzip
+    )
+
+# READ ONE
+@router.get("/{event_id}", response_model=schemas.EventResponse)
+async def read_event(event_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    lookup = response_cache.lookup(request)
+    if lookup.hit is not None:
+        return lookup.hit
+    event = await db.get(models.Event, event_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return lookup.store(event, [("events", event_id)], schemas.EventResponse)
+
+# UPDATE
+@router.put("/{event_id}", response_model=schemas.EventResponse)
+async def update_event(
+    event_id: int,
+    event_update: schemas.EventCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_event = await db.get(models.Event, event_id)
+    if db_event is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    for field, value in parse_temporal(event_update.dict()).items():
+        setattr(db_event, field, value)
+
+    await db.commit()
+    await db.refresh(db_event)
+    response_cache.invalidate("events", event_id)
+    return db_event
+
+# DELETE
+@router.delete("/{event_id}")
+async def delete_event(event_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_event = await db.get(models.Event, event_id)
+    if db_event is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    await db.delete(db_event)
+    await db.commit()
+    response_cache.invalidate("events", event_id)
+    # the ORM set event_id to NULL on its reportages; their ids are not known here
+    response_cache.invalidate_table("reportage")
+    return {"message": "Event deleted"}
@@ -0,0 +1,392 @@
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+from app.database import get_async_db
+from app import models
+from app.api.queries import (
+    REPORTAGE_DETAILS, SORT_FIELDS, city_danger_events, operator_price_update,
+    price_multiplier, price_update_result
+)
+from app.search import (
+    format_total, metadata_conditions, metadata_contains, metadata_regex,
+    parse_metadata_filter, ranked_search, search_page, split_total, total_query,
+    validate_pattern
+)
+from app.cache import response_cache
+from app.serialization import EVENT_ROWS, row_dicts, rows_response
+from app.export import check_format, export_response, reportage_details_export, stream_export_async
+from app.counters import check_order, top_correspondents
+from app.stats import LIVE_STATS, ROLLUP_STATS, format_stats, stats_headers
+from app.timeouts import STATEMENT_TIMEOUTS_MS, run_with_budget_async
+from app.pagination import keyset_page, keyset_sorted_page, set_next_cursor
+
+router = APIRouter(prefix="/queries", tags=["queries"])
+
+
+# 1. SELECT ... WHERE
+@router.get("/events_by_city_and_danger")
+async def get_events_by_city_and_danger(
+    request: Request,
+    city: str = Query(..., description="City name"),
+    danger_level: str = Query(..., description="Danger level (low/medium/high)"),
+    min_duration: Optional[int] = Query(None, description="Minimum duration in minutes"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """SELECT events WHERE city = ? AND danger = ? AND duration >= ?"""
+    lookup = response_cache.lookup(request)
+    if lookup.hit is not None:
+        return lookup.hit
+    rows = (await db.execute(city_danger_events(city, danger_level, min_duration))).all()
+    return lookup.store(row_dicts(rows), [("events", None)])
+
+
+# 2. JOIN
+@router.get("/reportages_with_details")
+async def get_reportages_with_details(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """JOIN reportages with events and correspondents"""
+    results = (await db.execute(
+        keyset_page(REPORTAGE_DETAILS, models.Reportage.id, cursor, skip, limit)
+    )).all()
+    set_next_cursor(response, results, limit, id=lambda row: row[0].id)
+
+    return [
+        {
+            "reportage_id": r.id,
+            "reportage_date": r.date,
+            "quality": r.quality,
+            "event_title": e.place if e else None,
+            "event_city": e.city if e else None,
+            "correspondent_name": c.name if c else None,
+            "correspondent_spec": c.specification if c else None
+        }
+        for r, e, c in results
+    ]
+
+
+@router.get("/reportages_with_details/export")
+async def export_reportages_with_details(
+    format: str = Query("ndjson", description="ndjson or csv"),
+    gzip: bool = Query(False, description="gzip-compress the stream"),
+    city: Optional[str] = Query(None, description="Event city"),
+    quality: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Stream the whole JOIN from a server-side cursor"""
+    statement = reportage_details_export(city, quality, date_from, date_to)
+    return export_response(
+        stream_export_async(statement, check_format(format), gzip), format, "reportages_with_details", gzip
+    )
+
+
+# 3. UPDATE
+@router.put("/increase_operator_prices")
+async def increase_operator_prices(
+    percentage: float = Query(10.0, ge=0.0, le=100.0, description="Percentage increase"),
+    min_price: Optional[float] = Query(None, description="Minimum current price to update"),
+    chunk_size: Optional[int] = Query(
+        None, ge=1, le=100000,
+        description="Commit every N rows (by id) instead of one transaction"
+    ),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """UPDATE correspondent SET price = round(price * (1 + ?/100), 2) WHERE operator = TRUE AND price >= ?"""
+    multiplier = price_multiplier(percentage)
+
+    if not chunk_size:
+        rows = (await db.execute(operator_price_update(multiplier, min_price))).all()
+        await db.commit()
+        response_cache.invalidate("correspondent", *(row.id for row in rows))
+        return price_update_result(percentage, multiplier, rows, chunks=1)
+
+    rows, chunks, last_id = [], 0, None
+    while True:
+        chunk = (await db.execute(
+            operator_price_update(multiplier, min_price, last_id, chunk_size)
+        )).all()
+        await db.commit()
+        if not chunk:
+            break
+        rows.extend(chunk)
+        chunks += 1
+        last_id = max(row.id for row in chunk)
+        if len(chunk) < chunk_size:
+            break
+
+    response_cache.invalidate("correspondent", *(row.id for row in rows))
+    return price_update_result(percentage, multiplier, rows, chunks)
+
+
+# 4. GROUP BY
+@router.get("/events_stats_by_city")
+async def get_events_stats_by_city(
+    request: Request,
+    response: Response,
+    fresh: bool = Query(False, description="Aggregate events live instead of reading the rollup"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Per-city aggregates from the trigger-maintained rollup (GROUP BY city with ?fresh=true)"""
+    if fresh:
+        rows = (await db.execute(LIVE_STATS)).all()
+        response.headers.update(stats_headers(rows, fresh))
+        return format_stats(rows)
+
+    lookup = response_cache.lookup(request)
+    if lookup.hit is not None:
+        return lookup.hit
+    rows = (await db.execute(ROLLUP_STATS)).all()
+    return lookup.store(
+        format_stats(rows), [("events", None), ("event_city_stats", None)],
+        headers=stats_headers(rows, fresh)
+    )
+
+
+# 4b. LEADERBOARD (trigger-maintained counters)
+@router.get("/top_correspondents")
+async def get_top_correspondents(
+    request: Request,
+    by: str = Query("count", description="Rank by reportage count or spend (count x price)"),
+    specification: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    fresh: bool = Query(False, description="Count reportages live instead of reading the counters"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Top correspondents by reportage count or spend, from the denormalized counters"""
+    statement = top_correspondents(check_order(by), specification, limit, fresh)
+    if fresh:
+        return row_dicts((await db.execute(statement)).all())
+
+    lookup = response_cache.lookup(request)
+    if lookup.hit is not None:
+        return lookup.hit
+    rows = (await db.execute(statement)).all()
+    return lookup.store(row_dicts(rows), [("reportage", None), ("correspondent", None)])
+
+
+# 5. SORT
+@router.get("/sorted_events")
+async def get_sorted_events(
+    response: Response,
+    sort_by: str = Query("date", description="Field to sort by (date, duration, city)"),
+    order: str = Query("desc", description="Sort order (asc or desc)"),
+    limit: int = Query(50, le=100, description="Maximum number of results"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """SORT events by specified field and order"""
+    if sort_by not in SORT_FIELDS:
+        sort_by = "date"
+    sort_field, parse = SORT_FIELDS[sort_by]
+
+    rows = (await db.execute(keyset_sorted_page(
+        EVENT_ROWS,
+        sort_field,
+        models.Event.id,
+        descending=order.lower() != "asc",
+        cursor=cursor,
+        parse=parse,
+        limit=limit
+    ))).all()
+    set_next_cursor(
+        response, rows, limit,
+        id=lambda row: row.id,
+        key=lambda row: getattr(row, sort_by)
+    )
+    return rows_response(row_dicts(rows), response)
+
+
+# 6. Full-text search in JSON field
+async def search_with_total(db, condition, limit, offset, total_mode):
+    """(events, total) for a search condition, see app.search.search_with_total"""
+    rows = (await db.execute(search_page(condition, limit, offset, total_mode))).all()
+    results, count = split_total(rows, total_mode, offset, limit)
+    if count is None and total_mode != "none":
+        count = await db.scalar(total_query(condition, total_mode))
+    return results, count
+
+
+@router.get("/fulltext_search_events")
+async def fulltext_search_events(
+    request: Request,
+    q: str = Query(..., description="Search query for extra_metadata"),
+    limit: int = Query(20, le=100),
+    offset: int = Query(0, ge=0),
+    total: str = Query(
+        "exact",
+        pattern="^(exact|estimate|none)$",
+        description="exact count, estimate (capped, e.g. \"1000+\") or none"
+    ),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search in extra_metadata JSON field using ilike"""
+    if not q.strip() or len(q.strip()) < 2:
+        raise HTTPException(
+            status_code=400,
+            detail="Search query must be at least 2 characters"
+        )
+
+    try:
+        results, count = await run_with_budget_async(
+            request, db, STATEMENT_TIMEOUTS_MS["fulltext_search_events"],
+            search_with_total, metadata_contains(q), limit, offset, total
+        )
+
+        return {
+            "results": results,
+            "total": format_total(count, total),
+            "query": q,
+            "offset": offset,
+            "limit": limit
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Search error: {str(e)}"
+        )
+
+
+# 7. Regex search in JSON field
+@router.get("/regex_search_events")
+async def regex_search_events(
+    request: Request,
+    pattern: str = Query(..., description="PostgreSQL regex pattern"),
+    limit: int = Query(20, le=100),
+    offset: int = Query(0, ge=0),
+    total: str = Query(
+        "exact",
+        pattern="^(exact|estimate|none)$",
+        description="exact count, estimate (capped, e.g. \"1000+\") or none"
+    ),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Search in extra_metadata using PostgreSQL regex patterns"""
+    validate_pattern(pattern)
+
+    try:
+        results, count = await run_with_budget_async(
+            request, db, STATEMENT_TIMEOUTS_MS["regex_search_events"],
+            search_with_total, metadata_regex(pattern), limit, offset, total
+        )
+
+        return {
+            "results": results,
+            "total": format_total(count, total),
+            "pattern": pattern,
+            "offset": offset,
+            "limit": limit
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = str(e)
+        if "invalid regular expression" in error_msg.lower():
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid regex pattern: {error_msg}"
+            )
+        raise HTTPException(
+            status_code=500,
+            detail=f"Regex search error: {error_msg}"
+        )
+
+
+# 8. Case-insensitive regex search
+@router.get("/search_events_json")
+async def search_events_json(
+    request: Request,
+    q: str = Query(..., description="Case-insensitive regex pattern to search in extra_metadata"),
+    limit: int = Query(20, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search in extra_metadata JSON field using case-insensitive regex"""
+    validate_pattern(q)
+
+    try:
+        results, _ = await run_with_budget_async(
+            request, db, STATEMENT_TIMEOUTS_MS["search_events_json"],
+            search_with_total, metadata_regex(q, case_sensitive=False), limit, 0, "none"
+        )
+        return results
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = str(e)
+        if "invalid regular expression" in error_msg.lower():
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid regex pattern: {error_msg}"
+            )
+        raise HTTPException(
+            status_code=500,
+            detail=f"Search error: {error_msg}"
+        )
+
+
+# 9. Ranked full-text search (tsvector)
+@router.get("/search_events")
+async def search_events(
+    q: str = Query(..., description="Web-search syntax: words, \"phrases\", OR, -exclude"),
+    limit: int = Query(20, le=100),
+    offset: int = Query(0, ge=0),
+    highlight: bool = Query(True, description="Include a highlighted snippet per result"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """websearch_to_tsquery over place, city, type and extra_metadata, ordered by ts_rank"""
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query cannot be empty")
+
+    rows = (await db.execute(ranked_search(q, limit, offset, highlight))).all()
+
+    return {
+        "results": [
+            {
+                "event": row[0],
+                "rank": row[1],
+                "snippet": row[2] if highlight else None
+            }
+            for row in rows
+        ],
+        "query": q,
+        "offset": offset,
+        "limit": limit
+    }
+
+
+# 10. Structured filter on extra_metadata keys (JSONB operators)
+@router.get("/events_by_metadata")
+async def get_events_by_metadata(
+    response: Response,
+    filter: List[str] = Query(
+        ...,
+        description="key:op:value with op in eq, ne, gt, gte, lt, lte, or key:exists "
+                    "(e.g. organizer:eq:Org_42, attendance:gt:1000); repeat to AND filters"
+    ),
+    limit: int = Query(50, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """SELECT events WHERE extra_metadata @> {...} AND jsonb_path_exists(...)"""
+    if len(filter) > 10:
+        raise HTTPException(status_code=400, detail="Too many filters (max 10)")
+
+    conditions = metadata_conditions([parse_metadata_filter(raw) for raw in filter])
+
+    events = (await db.scalars(keyset_page(
+        select(models.Event).where(*conditions), models.Event.id, cursor, 0, limit
+    ))).all()
+    set_next_cursor(response, events, limit)
+
+    return events
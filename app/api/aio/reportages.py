@@ -0,0 +1,126 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import exc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+from app.database import get_async_db
+from app import models, schemas
+from app.api.reportages import (
+    EXPAND_QUERY, expanded_dicts, expanded_tags, insert_reportage, parse_expand, reference_error,
+    update_reportage_row, with_relations
+)
+from app.pagination import keyset_page, set_next_cursor
+from app.cache import response_cache
+from app.serialization import REPORTAGE_ROWS, row_dicts, rows_response
+from app.export import check_format, export_response, reportages_export, stream_export_async
+
+router = APIRouter(prefix="/reportages", tags=["reportages"])
+
+# CREATE (the foreign keys check that the event and correspondent exist)
+@router.post("/", response_model=schemas.ReportageResponse)
+async def create_reportage(
+    reportage: schemas.ReportageCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        row = (await db.execute(insert_reportage(reportage))).one()
+        await db.commit()
+    except exc.IntegrityError as e:
+        await db.rollback()
+        raise reference_error(e) or e
+
+    response_cache.invalidate("reportage", row.id)
+    return row._asdict()
+
+# READ ALL (paginated, ?expand=event,correspondent)
+@router.get("/", response_model=List[schemas.ReportageExpanded])
+async def read_reportages(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    expand: Optional[str] = EXPAND_QUERY,
+    db: AsyncSession = Depends(get_async_db)
+):
+    relations = parse_expand(expand)
+    if relations:
+        reportages = (await db.scalars(with_relations(
+            keyset_page(select(models.Reportage), models.Reportage.id, cursor, skip, limit), relations
+        ))).all()
+        set_next_cursor(response, reportages, limit)
+        return rows_response(expanded_dicts(reportages, relations), response)
+
+    rows = (await db.execute(
+        keyset_page(REPORTAGE_ROWS, models.Reportage.id, cursor, skip, limit)
+    )).all()
+    set_next_cursor(response, rows, limit)
+    return rows_response(row_dicts(rows), response)
+
+# EXPORT (NDJSON or CSV, streamed; declared before /{reportage_id})
+@router.get("/export")
+async def export_reportages(
+    format: str = Query("ndjson", description="ndjson or csv"),
+    gzip: bool = Query(False, description="gzip-compress the stream"),
+    event_id: Optional[int] = None,
+    correspondent_id: Optional[int] = None,
+    quality: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Stream all matching reportages from a server-side cursor"""
+    statement = reportages_export(event_id, correspondent_id, quality, date_from, date_to)
+    return export_response(
+        stream_export_async(statement, check_format(format), gzip), format, "reportages", gzip
+    )
+
+# READ ONE (?expand=event,correspondent)
+@router.get("/{reportage_id}", response_model=schemas.ReportageExpanded)
+async def read_reportage(
+    reportage_id: int,
+    request: Request,
+    expand: Optional[str] = EXPAND_QUERY,
+    db: AsyncSession = Depends(get_async_db)
+):
+    relations = parse_expand(expand)
+    lookup = response_cache.lookup(request)
+    if lookup.hit is not None:
+        return lookup.hit
+    reportage = (await db.scalars(with_relations(
+        select(models.Reportage).where(models.Reportage.id == reportage_id), relations
+    ))).first()
+    if reportage is None:
+        raise HTTPException(status_code=404, detail="Reportage not found")
+    if relations:
+        return lookup.store(expanded_dicts([reportage], relations)[0], expanded_tags(reportage, relations))
+    return lookup.store(reportage, [("reportage", reportage_id)], schemas.ReportageResponse)
+
+# UPDATE
+@router.put("/{reportage_id}", response_model=schemas.ReportageResponse)
+async def update_reportage(
+    reportage_id: int,
+    reportage_update: schemas.ReportageCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        row = (await db.execute(update_reportage_row(reportage_id, reportage_update))).first()
+        await db.commit()
+    except exc.IntegrityError as e:
+        await db.rollback()
+        raise reference_error(e) or e
+    if row is None:
+        raise HTTPException(status_code=404, detail="Reportage not found")
+
+    response_cache.invalidate("reportage", reportage_id)
+    return row._asdict()
+
+# DELETE
+@router.delete("/{reportage_id}")
+async def delete_reportage(reportage_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_reportage = await db.get(models.Reportage, reportage_id)
+    if db_reportage is None:
+        raise HTTPException(status_code=404, detail="Reportage not found")
+
+    await db.delete(db_reportage)
+    await db.commit()
+    response_cache.invalidate("reportage", reportage_id)
+    return {"message": "Reportage deleted"}
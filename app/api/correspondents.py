@@ -1,18 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import SessionLocal
+from typing import List, Optional
+from app.database import get_db
 from app import models, schemas
+from app.pagination import keyset_page, set_next_cursor
+from app.bulk import BULK_OPENAPI, bulk_create, created_ids, read_items
+from app.cache import response_cache
+from app.serialization import CORRESPONDENT_ROWS, row_dicts, rows_response
 
 router = APIRouter(prefix="/correspondents", tags=["correspondents"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # CREATE
 @router.post("/", response_model=schemas.CorrespondentResponse)
 def create_correspondent(
@@ -23,27 +21,48 @@ def create_correspondent(
     db.add(db_correspondent)
     db.commit()
     db.refresh(db_correspondent)
+    response_cache.invalidate("correspondent", db_correspondent.id)
     return db_correspondent
 
+# BULK CREATE (JSON array or NDJSON body, one transaction, per-item errors)
+@router.post("/bulk", openapi_extra=BULK_OPENAPI)
+async def create_correspondents_bulk(request: Request, db: Session = Depends(get_db)):
+    items = await read_items(request)
+    result = await run_in_threadpool(
+        bulk_create, db, items, schemas.CorrespondentCreate, models.Correspondent
+    )
+    response_cache.invalidate("correspondent", *created_ids(result))
+    return result
+
 # READ ALL 
 @router.get("/", response_model=List[schemas.CorrespondentResponse])
 def read_correspondents(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    correspondents = db.query(models.Correspondent).offset(skip).limit(limit).all()
-    return correspondents
+    rows = db.execute(
+        keyset_page(CORRESPONDENT_ROWS, models.Correspondent.id, cursor, skip, limit)
+    ).all()
+    set_next_cursor(response, rows, limit)
+    return rows_response(row_dicts(rows), response)
 
 # READ ONE
 @router.get("/{correspondent_id}", response_model=schemas.CorrespondentResponse)
-def read_correspondent(correspondent_id: int, db: Session = Depends(get_db)):
+def read_correspondent(correspondent_id: int, request: Request, db: Session = Depends(get_db)):
+    lookup = response_cache.lookup(request)
+    if lookup.hit is not None:
+        return lookup.hit
     correspondent = db.query(models.Correspondent).filter(
         models.Correspondent.id == correspondent_id
     ).first()
     if correspondent is None:
         raise HTTPException(status_code=404, detail="Correspondent not found")
-    return correspondent
+    return lookup.store(
+        correspondent, [("correspondent", correspondent_id)], schemas.CorrespondentResponse
+    )
 
 # UPDATE
 @router.put("/{correspondent_id}", response_model=schemas.CorrespondentResponse)
@@ -63,6 +82,7 @@ def update_correspondent(
     
     db.commit()
     db.refresh(db_correspondent)
+    response_cache.invalidate("correspondent", correspondent_id)
     return db_correspondent
 
 # DELETE
@@ -76,4 +96,7 @@ def delete_correspondent(correspondent_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_correspondent)
     db.commit()
+    response_cache.invalidate("correspondent", correspondent_id)
+    # the ORM set correspondent_id to NULL on its reportages; their ids are not known here
+    response_cache.invalidate_table("reportage")
     return {"message": "Correspondent deleted"}
\ No newline at end of file
@@ -1,19 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
-import json
-from app.database import SessionLocal
+from typing import List, Optional
+from datetime import date
+from app.database import get_db
 from app import models, schemas
+from app.pagination import keyset_page, set_next_cursor
+from app.bulk import BULK_OPENAPI, bulk_create, created_ids, read_items
+from app.cache import response_cache
+from app.serialization import EVENT_ROWS, row_dicts, rows_response
+from app.export import check_format, events_export, export_response, stream_export
 
 router = APIRouter(prefix="/events", tags=["events"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # CREATE
 @router.post("/", response_model=schemas.EventResponse)
 def create_event(event: schemas.EventCreate, db: Session = Depends(get_db)):
@@ -21,59 +20,61 @@ def create_event(event: schemas.EventCreate, db: Session = Depends(get_db)):
     db.add(db_event)
     db.commit()
     db.refresh(db_event)
-    
-    response_data = db_event.__dict__.copy()
-    response_data['date'] = str(db_event.date) if db_event.date else None
-    
-    if response_data.get('extra_metadata') and isinstance(response_data['extra_metadata'], str):
-        try:
-            response_data['extra_metadata'] = json.loads(response_data['extra_metadata'])
-        except:
-            response_data['extra_metadata'] = None
-    
-    return response_data
+    response_cache.invalidate("events", db_event.id)
+    return db_event
+
+# BULK CREATE (JSON array or NDJSON body, one transaction, per-item errors)
+@router.post("/bulk", openapi_extra=BULK_OPENAPI)
+async def create_events_bulk(request: Request, db: Session = Depends(get_db)):
+    items = await read_items(request)
+    result = await run_in_threadpool(
+        bulk_create, db, items, schemas.EventCreate, models.Event
+    )
+    response_cache.invalidate("events", *created_ids(result))
+    return result
 
 # READ ALL 
 @router.get("/", response_model=List[schemas.EventResponse])
 def read_events(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,  
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    events = db.query(models.Event).offset(skip).limit(limit).all()
-    
-    result = []
-    for event in events:
-        event_dict = event.__dict__.copy()
-        event_dict['date'] = str(event.date) if event.date else None
-        
-        if event_dict.get('extra_metadata') and isinstance(event_dict['extra_metadata'], str):
-            try:
-                event_dict['extra_metadata'] = json.loads(event_dict['extra_metadata'])
-            except:
-                event_dict['extra_metadata'] = None
-        
-        result.append(event_dict)
-    
-    return result
+    rows = db.execute(
+        keyset_page(EVENT_ROWS, models.Event.id, cursor, skip, limit)
+    ).all()
+    set_next_cursor(response, rows, limit)
+    return rows_response(row_dicts(rows), response)
+
+# EXPORT (NDJSON or CSV, streamed; declared before /{event_id})
+@router.get("/export")
+def export_events(
+    format: str = Query("ndjson", description="ndjson or csv"),
+    gzip: bool = Query(False, description="gzip-compress the stream"),
+    city: Optional[str] = None,
+    danger: Optional[str] = None,
+    type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Stream all matching events from a server-side cursor"""
+    statement = events_export(city, danger, type, date_from, date_to)
+    return export_response(
+        stream_export(statement, check_format(format), gzip), format, "events", gzip
+    )
 
 # READ ONE
 @router.get("/{event_id}", response_model=schemas.EventResponse)
-def read_event(event_id: int, db: Session = Depends(get_db)):
+def read_event(event_id: int, request: Request, db: Session = Depends(get_db)):
+    lookup = response_cache.lookup(request)
+    if lookup.hit is not None:
+        return lookup.hit
     event = db.query(models.Event).filter(models.Event.id == event_id).first()
     if event is None:
         raise HTTPException(status_code=404, detail="Event not found")
-    
-    event_dict = event.__dict__.copy()
-    event_dict['date'] = str(event.date) if event.date else None
-    
-    if event_dict.get('extra_metadata') and isinstance(event_dict['extra_metadata'], str):
-        try:
-            event_dict['extra_metadata'] = json.loads(event_dict['extra_metadata'])
-        except:
-            event_dict['extra_metadata'] = None
-    
-    return event_dict
+    return lookup.store(event, [("events", event_id)], schemas.EventResponse)
 
 # UPDATE
 @router.put("/{event_id}", response_model=schemas.EventResponse)
@@ -91,18 +92,8 @@ def update_event(
     
     db.commit()
     db.refresh(db_event)
-    
-    response_data = db_event.__dict__.copy()
-    response_data['date'] = str(db_event.date) if db_event.date else None
-    
-
-    if response_data.get('extra_metadata') and isinstance(response_data['extra_metadata'], str):
-        try:
-            response_data['extra_metadata'] = json.loads(response_data['extra_metadata'])
-        except:
-            response_data['extra_metadata'] = None
-    
-    return response_data
+    response_cache.invalidate("events", event_id)
+    return db_event
 
 # DELETE
 @router.delete("/{event_id}")
@@ -113,5 +104,8 @@ def delete_event(event_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_event)
     db.commit()
+    response_cache.invalidate("events", event_id)
+    # the ORM set event_id to NULL on its reportages; their ids are not known here
+    response_cache.invalidate_table("reportage")
     
     return {"message": "Event deleted"}
\ No newline at end of file
@@ -1,57 +1,79 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from datetime import date
+from decimal import Decimal
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text
+from sqlalchemy import Numeric, func, literal, select, update
 from typing import List, Optional
-from app.database import SessionLocal
+from app.database import get_db
 from app import models, schemas
+from app.search import (
+    format_total, metadata_conditions, metadata_contains, metadata_regex,
+    parse_metadata_filter, ranked_search, search_with_total, validate_pattern
+)
+from app.cache import response_cache
+from app.serialization import EVENT_ROWS, row_dicts, rows_response
+from app.export import check_format, export_response, reportage_details_export, stream_export
+from app.counters import check_order, top_correspondents
+from app.stats import LIVE_STATS, ROLLUP_STATS, format_stats, stats_headers
+from app.timeouts import STATEMENT_TIMEOUTS_MS, run_with_budget
+from app.pagination import keyset_page, keyset_sorted_page, set_next_cursor
 
 router = APIRouter(prefix="/queries", tags=["queries"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 # 1. SELECT ... WHERE 
+def city_danger_events(city: str, danger_level: str, min_duration: Optional[int] = None):
+    """Served by ix_events_city_danger_duration."""
+    query = EVENT_ROWS.where(
+        models.Event.city == city,
+        models.Event.danger == danger_level
+    )
+    if min_duration:
+        query = query.where(models.Event.duration >= min_duration)
+    return query
+
+
 @router.get("/events_by_city_and_danger")
 def get_events_by_city_and_danger(
+    request: Request,
     city: str = Query(..., description="City name"),
     danger_level: str = Query(..., description="Danger level (low/medium/high)"),
     min_duration: Optional[int] = Query(None, description="Minimum duration in minutes"),
     db: Session = Depends(get_db)
 ):
     """SELECT events WHERE city = ? AND danger = ? AND duration >= ?"""
-    query = db.query(models.Event).filter(
-        models.Event.city == city,
-        models.Event.danger == danger_level
-    )
-    
-    if min_duration:
-        query = query.filter(models.Event.duration >= min_duration)
-    
-    return query.all()
+    lookup = response_cache.lookup(request)
+    if lookup.hit is not None:
+        return lookup.hit
+    rows = db.execute(city_danger_events(city, danger_level, min_duration)).all()
+    return lookup.store(row_dicts(rows), [("events", None)])
 
 
 # 2. JOIN 
+REPORTAGE_DETAILS = select(
+    models.Reportage,
+    models.Event,
+    models.Correspondent
+).join(
+    models.Event, models.Reportage.event_id == models.Event.id
+).join(
+    models.Correspondent, models.Reportage.correspondent_id == models.Correspondent.id
+)
+
+
 @router.get("/reportages_with_details")
 def get_reportages_with_details(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """JOIN reportages with events and correspondents"""
-    results = db.query(
-        models.Reportage,
-        models.Event,
-        models.Correspondent
-    ).join(
-        models.Event, models.Reportage.event_id == models.Event.id
-    ).join(
-        models.Correspondent, models.Reportage.correspondent_id == models.Correspondent.id
-    ).offset(skip).limit(limit).all()
+    results = db.execute(
+        keyset_page(REPORTAGE_DETAILS, models.Reportage.id, cursor, skip, limit)
+    ).all()
+    set_next_cursor(response, results, limit, id=lambda row: row[0].id)
     
     return [
         {
@@ -67,125 +89,228 @@ def get_reportages_with_details(
     ]
 
 
+@router.get("/reportages_with_details/export")
+def export_reportages_with_details(
+    format: str = Query("ndjson", description="ndjson or csv"),
+    gzip: bool = Query(False, description="gzip-compress the stream"),
+    city: Optional[str] = Query(None, description="Event city"),
+    quality: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Stream the whole JOIN from a server-side cursor"""
+    statement = reportage_details_export(city, quality, date_from, date_to)
+    return export_response(
+        stream_export(statement, check_format(format), gzip), format, "reportages_with_details", gzip
+    )
+
+
 # 3. UPDATE 
+def price_multiplier(percentage: float) -> Decimal:
+    # str() keeps the decimal the client sent (10.1 -> 1.101, not 1.10099999...)
+    return 1 + Decimal(str(percentage)) / 100
+
+
+def operator_price_update(multiplier: Decimal, min_price=None, after_id=None, chunk_size=None):
+    """One set-based UPDATE ... RETURNING id, old price, new price, in exact numeric.
+
+    With `chunk_size`, only the next `chunk_size` matching ids after `after_id`
+    are updated, so a large roster can be committed in batches.
+    """
+    target = select(models.Correspondent.id, models.Correspondent.price).where(
+        models.Correspondent.operator == True
+    )
+    if min_price is not None:
+        target = target.where(models.Correspondent.price >= Decimal(str(min_price)))
+    if after_id is not None:
+        target = target.where(models.Correspondent.id > after_id)
+    if chunk_size:
+        target = target.order_by(models.Correspondent.id).limit(chunk_size)
+    target = target.with_for_update().cte("target")
+
+    return update(models.Correspondent).where(
+        models.Correspondent.id == target.c.id
+    ).values(
+        price=func.round(models.Correspondent.price * literal(multiplier, Numeric), 2)
+    ).returning(
+        models.Correspondent.id,
+        target.c.price.label("old_price"),
+        models.Correspondent.price.label("new_price")
+    ).execution_options(synchronize_session=False)
+
+
+def price_update_result(percentage, multiplier, rows, chunks):
+    return {
+        "message": f"Updated {len(rows)} correspondents",
+        "percentage_increase": percentage,
+        "multiplier": multiplier,
+        "updated_ids": sorted(row.id for row in rows),
+        "total_before": sum(row.old_price for row in rows if row.old_price is not None),
+        "total_after": sum(row.new_price for row in rows if row.new_price is not None),
+        "chunks": chunks
+    }
+
+
 @router.put("/increase_operator_prices")
 def increase_operator_prices(
     percentage: float = Query(10.0, ge=0.0, le=100.0, description="Percentage increase"),
     min_price: Optional[float] = Query(None, description="Minimum current price to update"),
+    chunk_size: Optional[int] = Query(
+        None, ge=1, le=100000,
+        description="Commit every N rows (by id) instead of one transaction"
+    ),
     db: Session = Depends(get_db)
 ):
-    """UPDATE correspondent SET price = price * (1 + ?/100) WHERE operator = TRUE AND price >= ?"""
-    multiplier = 1 + (percentage / 100.0)
-    
-    query = db.query(models.Correspondent).filter(
-        models.Correspondent.operator == True
-    )
-    
-    if min_price:
-        query = query.filter(models.Correspondent.price >= min_price)
+    """UPDATE correspondent SET price = round(price * (1 + ?/100), 2) WHERE operator = TRUE AND price >= ?"""
+    multiplier = price_multiplier(percentage)
     
-    correspondents = query.all()
-    updated_count = 0
+    if not chunk_size:
+        rows = db.execute(operator_price_update(multiplier, min_price)).all()
+        db.commit()
+        response_cache.invalidate("correspondent", *(row.id for row in rows))
+        return price_update_result(percentage, multiplier, rows, chunks=1)
     
-    for corr in correspondents:
-        
-        current_price = float(corr.price) if corr.price else 0.0
-        corr.price = round(current_price * multiplier, 2)
-        updated_count += 1
+    rows, chunks, last_id = [], 0, None
+    while True:
+        chunk = db.execute(
+            operator_price_update(multiplier, min_price, last_id, chunk_size)
+        ).all()
+        db.commit()
+        if not chunk:
+            break
+        rows.extend(chunk)
+        chunks += 1
+        last_id = max(row.id for row in chunk)
+        if len(chunk) < chunk_size:
+            break
     
-    db.commit()
-    
-    return {
-        "message": f"Updated {updated_count} correspondents",
-        "percentage_increase": percentage,
-        "multiplier": multiplier
-    }
+    response_cache.invalidate("correspondent", *(row.id for row in rows))
+    return price_update_result(percentage, multiplier, rows, chunks)
 
 
 # 4. GROUP BY 
 @router.get("/events_stats_by_city")
-def get_events_stats_by_city(db: Session = Depends(get_db)):
-    """GROUP BY city with aggregate functions"""
-    stats = db.query(
-        models.Event.city,
-        func.count(models.Event.id).label("total_events"),
-        func.avg(models.Event.duration).label("avg_duration"),
-        func.min(models.Event.duration).label("min_duration"),
-        func.max(models.Event.duration).label("max_duration")
-    ).group_by(models.Event.city).all()
-    
-    return [
-        {
-            "city": city,
-            "total_events": total_events,
-            "avg_duration": float(avg_duration) if avg_duration else 0,
-            "min_duration": min_duration,
-            "max_duration": max_duration
-        }
-        for city, total_events, avg_duration, min_duration, max_duration in stats
-    ]
+def get_events_stats_by_city(
+    request: Request,
+    response: Response,
+    fresh: bool = Query(False, description="Aggregate events live instead of reading the rollup"),
+    db: Session = Depends(get_db)
+):
+    """Per-city aggregates from the trigger-maintained rollup (GROUP BY city with ?fresh=true)"""
+    if fresh:
+        rows = db.execute(LIVE_STATS).all()
+        response.headers.update(stats_headers(rows, fresh))
+        return format_stats(rows)
+
+    lookup = response_cache.lookup(request)
+    if lookup.hit is not None:
+        return lookup.hit
+    rows = db.execute(ROLLUP_STATS).all()
+    return lookup.store(
+        format_stats(rows), [("events", None), ("event_city_stats", None)],
+        headers=stats_headers(rows, fresh)
+    )
+
+
+# 4b. LEADERBOARD (trigger-maintained counters)
+@router.get("/top_correspondents")
+def get_top_correspondents(
+    request: Request,
+    by: str = Query("count", description="Rank by reportage count or spend (count x price)"),
+    specification: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    fresh: bool = Query(False, description="Count reportages live instead of reading the counters"),
+    db: Session = Depends(get_db)
+):
+    """Top correspondents by reportage count or spend, from the denormalized counters"""
+    statement = top_correspondents(check_order(by), specification, limit, fresh)
+    if fresh:
+        return row_dicts(db.execute(statement).all())
+
+    lookup = response_cache.lookup(request)
+    if lookup.hit is not None:
+        return lookup.hit
+    rows = db.execute(statement).all()
+    return lookup.store(row_dicts(rows), [("reportage", None), ("correspondent", None)])
 
 
 # 5. SORT 
+# sort key -> (column, parser for the key stored in the cursor)
+SORT_FIELDS = {
+    "date": (models.Event.date, date.fromisoformat),
+    "duration": (models.Event.duration, int),
+    "city": (models.Event.city, str),
+}
+
 @router.get("/sorted_events")
 def get_sorted_events(
+    response: Response,
     sort_by: str = Query("date", description="Field to sort by (date, duration, city)"),
     order: str = Query("desc", description="Sort order (asc or desc)"),
     limit: int = Query(50, le=100, description="Maximum number of results"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     db: Session = Depends(get_db)
 ):
     """SORT events by specified field and order"""
     
-    sort_field = None
-    if sort_by == "date":
-        sort_field = models.Event.date
-    elif sort_by == "duration":
-        sort_field = models.Event.duration
-    elif sort_by == "city":
-        sort_field = models.Event.city
-    else:
-        sort_field = models.Event.date 
+    if sort_by not in SORT_FIELDS:
+        sort_by = "date"
+    sort_field, parse = SORT_FIELDS[sort_by]
     
-    if order.lower() == "asc":
-        query = db.query(models.Event).order_by(sort_field.asc())
-    else:
-        query = db.query(models.Event).order_by(sort_field.desc())
-    
-    return query.limit(limit).all()
+    rows = db.execute(keyset_sorted_page(
+        EVENT_ROWS,
+        sort_field,
+        models.Event.id,
+        descending=order.lower() != "asc",
+        cursor=cursor,
+        parse=parse,
+        limit=limit
+    )).all()
+    set_next_cursor(
+        response, rows, limit,
+        id=lambda row: row.id,
+        key=lambda row: getattr(row, sort_by)
+    )
+    return rows_response(row_dicts(rows), response)
 
 
 # 6. Full-text search in JSON field
 @router.get("/fulltext_search_events")
-def fulltext_search_events(
+async def fulltext_search_events(
+    request: Request,
     q: str = Query(..., description="Search query for extra_metadata"),
     limit: int = Query(20, le=100),
     offset: int = Query(0, ge=0),
+    total: str = Query(
+        "exact",
+        pattern="^(exact|estimate|none)$",
+        description="exact count, estimate (capped, e.g. \"1000+\") or none"
+    ),
     db: Session = Depends(get_db)
 ):
     """Full-text search in extra_metadata JSON field using ilike"""
+    if not q.strip() or len(q.strip()) < 2:
+        raise HTTPException(
+            status_code=400, 
+            detail="Search query must be at least 2 characters"
+        )
+    
     try:
-        if not q.strip() or len(q.strip()) < 2:
-            raise HTTPException(
-                status_code=400, 
-                detail="Search query must be at least 2 characters"
-            )
-        
-        results = db.query(models.Event).filter(
-            models.Event.extra_metadata.cast(text).ilike(f'%{q}%')
-        ).offset(offset).limit(limit).all()
-        
-        total = db.query(models.Event).filter(
-            models.Event.extra_metadata.cast(text).ilike(f'%{q}%')
-        ).count()
+        results, count = await run_with_budget(
+            request, db, STATEMENT_TIMEOUTS_MS["fulltext_search_events"],
+            search_with_total, metadata_contains(q), limit, offset, total
+        )
         
         return {
             "results": results,
-            "total": total,
+            "total": format_total(count, total),
             "query": q,
             "offset": offset,
             "limit": limit
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
@@ -195,42 +320,37 @@ def fulltext_search_events(
 
 # 7. Regex search in JSON field
 @router.get("/regex_search_events")
-def regex_search_events(
+async def regex_search_events(
+    request: Request,
     pattern: str = Query(..., description="PostgreSQL regex pattern"),
     limit: int = Query(20, le=100),
     offset: int = Query(0, ge=0),
+    total: str = Query(
+        "exact",
+        pattern="^(exact|estimate|none)$",
+        description="exact count, estimate (capped, e.g. \"1000+\") or none"
+    ),
     db: Session = Depends(get_db)
 ):
     """Search in extra_metadata using PostgreSQL regex patterns"""
+    validate_pattern(pattern)
+    
     try:
-        if not pattern.strip():
-            raise HTTPException(
-                status_code=400, 
-                detail="Pattern cannot be empty"
-            )
-        
-        if len(pattern) > 500:
-            raise HTTPException(
-                status_code=400, 
-                detail="Pattern too long (max 500 characters)"
-            )
-        
-        results = db.query(models.Event).filter(
-            models.Event.extra_metadata.cast(text).op("~")(pattern)
-        ).offset(offset).limit(limit).all()
-        
-        total = db.query(models.Event).filter(
-            models.Event.extra_metadata.cast(text).op("~")(pattern)
-        ).count()
+        results, count = await run_with_budget(
+            request, db, STATEMENT_TIMEOUTS_MS["regex_search_events"],
+            search_with_total, metadata_regex(pattern), limit, offset, total
+        )
         
         return {
             "results": results,
-            "total": total,
+            "total": format_total(count, total),
             "pattern": pattern,
             "offset": offset,
             "limit": limit
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         error_msg = str(e)
         if "invalid regular expression" in error_msg.lower():
@@ -246,19 +366,24 @@ def regex_search_events(
 
 # 8. Case-insensitive regex search 
 @router.get("/search_events_json")
-def search_events_json(
+async def search_events_json(
+    request: Request,
     q: str = Query(..., description="Case-insensitive regex pattern to search in extra_metadata"),
     limit: int = Query(20, le=100),
     db: Session = Depends(get_db)
 ):
     """Full-text search in extra_metadata JSON field using case-insensitive regex"""
+    validate_pattern(q)
+    
     try:
-        results = db.query(models.Event).filter(
-            models.Event.extra_metadata.cast(text).op("~*")(q)
-        ).limit(limit).all()
-        
+        results, _ = await run_with_budget(
+            request, db, STATEMENT_TIMEOUTS_MS["search_events_json"],
+            search_with_total, metadata_regex(q, case_sensitive=False), limit, 0, "none"
+        )
         return results
         
+    except HTTPException:
+        raise
     except Exception as e:
         error_msg = str(e)
         if "invalid regular expression" in error_msg.lower():
@@ -269,4 +394,61 @@ def search_events_json(
         raise HTTPException(
             status_code=500, 
             detail=f"Search error: {error_msg}"
-        )
\ No newline at end of file
+        )
+
+
+# 9. Ranked full-text search (tsvector)
+@router.get("/search_events")
+def search_events(
+    q: str = Query(..., description="Web-search syntax: words, \"phrases\", OR, -exclude"),
+    limit: int = Query(20, le=100),
+    offset: int = Query(0, ge=0),
+    highlight: bool = Query(True, description="Include a highlighted snippet per result"),
+    db: Session = Depends(get_db)
+):
+    """websearch_to_tsquery over place, city, type and extra_metadata, ordered by ts_rank"""
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query cannot be empty")
+    
+    rows = db.execute(ranked_search(q, limit, offset, highlight)).all()
+    
+    return {
+        "results": [
+            {
+                "event": row[0],
+                "rank": row[1],
+                "snippet": row[2] if highlight else None
+            }
+            for row in rows
+        ],
+        "query": q,
+        "offset": offset,
+        "limit": limit
+    }
+
+
+# 10. Structured filter on extra_metadata keys (JSONB operators)
+@router.get("/events_by_metadata")
+def get_events_by_metadata(
+    response: Response,
+    filter: List[str] = Query(
+        ...,
+        description="key:op:value with op in eq, ne, gt, gte, lt, lte, or key:exists "
+                    "(e.g. organizer:eq:Org_42, attendance:gt:1000); repeat to AND filters"
+    ),
+    limit: int = Query(50, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    db: Session = Depends(get_db)
+):
+    """SELECT events WHERE extra_metadata @> {...} AND jsonb_path_exists(...)"""
+    if len(filter) > 10:
+        raise HTTPException(status_code=400, detail="Too many filters (max 10)")
+    
+    conditions = metadata_conditions([parse_metadata_filter(raw) for raw in filter])
+    
+    events = keyset_page(
+        db.query(models.Event).filter(*conditions), models.Event.id, cursor, 0, limit
+    ).all()
+    set_next_cursor(response, events, limit)
+    
+    return events
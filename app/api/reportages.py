@@ -1,96 +1,220 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import exc, insert, select, update
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
+from datetime import date
+from app.database import get_db
 from app import models, schemas
+from app.schemas import parse_temporal
+from app.pagination import keyset_page, set_next_cursor
+from app.bulk import BULK_OPENAPI, bulk_create, created_ids, existing_ids, read_items
+from app.cache import response_cache
+from app.serialization import REPORTAGE_COLUMNS, REPORTAGE_ROWS, row_dicts, rows_response
+from app.export import check_format, export_response, reportages_export, stream_export
 
 router = APIRouter(prefix="/reportages", tags=["reportages"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+FOREIGN_KEY_VIOLATION = "23503"
+
+# FK column -> the 404 the handlers used to raise after their own SELECT
+MISSING_REFERENCE = {
+    "event_id": "Event not found",
+    "correspondent_id": "Correspondent not found",
+}
+
+
+def reference_error(error: exc.IntegrityError):
+    """404 for a reportage FK violation (psycopg2 or asyncpg), None for other errors."""
+    if getattr(error.orig, "pgcode", None) != FOREIGN_KEY_VIOLATION:
+        return None
+    message = str(error.orig)
+    for column, detail in MISSING_REFERENCE.items():
+        if column in message:
+            return HTTPException(status_code=404, detail=detail)
+    return None
+
+
+# ?expand= name -> (relationship, nested response schema)
+EXPANDABLE = {
+    "event": (models.Reportage.event, schemas.EventResponse),
+    "correspondent": (models.Reportage.correspondent, schemas.CorrespondentResponse),
+}
+
+EXPAND_QUERY = Query(None, description="Comma-separated relations to inline: event, correspondent")
+
+
+def parse_expand(expand: Optional[str]) -> list:
+    """?expand=event,correspondent -> relation names; 400 for anything else."""
+    if not expand:
+        return []
+    names = list(dict.fromkeys(name.strip() for name in expand.split(",") if name.strip()))
+    unknown = [name for name in names if name not in EXPANDABLE]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot expand {', '.join(unknown)}; expandable: {', '.join(EXPANDABLE)}"
+        )
+    return names
+
+
+def with_relations(statement, relations):
+    """selectinload each relation: one SELECT ... WHERE id IN (...) per page, not one per row."""
+    return statement.options(*(selectinload(EXPANDABLE[name][0]) for name in relations))
+
+
+def expanded_dicts(reportages, relations) -> list:
+    """ReportageExpanded dicts; a related row shared by several reportages is validated once."""
+    keys = [column.key for column in REPORTAGE_COLUMNS]
+    rendered = {}
+    items = []
+    for reportage in reportages:
+        item = {key: getattr(reportage, key) for key in keys}
+        for name in relations:
+            related = getattr(reportage, name)
+            if related is not None and (name, related.id) not in rendered:
+                rendered[name, related.id] = EXPANDABLE[name][1].model_validate(related).model_dump()
+            item[name] = None if related is None else rendered[name, related.id]
+        items.append(item)
+    return items
 
-# CREATE (проверяем существование event и correspondent)
+
+def expanded_tags(reportage, relations) -> list:
+    """Cache tags of an expanded reportage: edits to the inlined rows invalidate it too."""
+    tags = [("reportage", reportage.id)]
+    if "event" in relations:
+        tags.append(("events", reportage.event_id))
+    if "correspondent" in relations:
+        tags.append(("correspondent", reportage.correspondent_id))
+    return tags
+
+
+def insert_reportage(reportage: schemas.ReportageCreate):
+    """INSERT ... RETURNING the response columns: the FKs check the references."""
+    return insert(models.Reportage).values(
+        **parse_temporal(reportage.dict())
+    ).returning(*REPORTAGE_COLUMNS)
+
+
+def update_reportage_row(reportage_id: int, reportage: schemas.ReportageCreate):
+    return update(models.Reportage).where(
+        models.Reportage.id == reportage_id
+    ).values(
+        **parse_temporal(reportage.dict())
+    ).returning(*REPORTAGE_COLUMNS)
+
+
+# CREATE (event и correspondent проверяются внешними ключами)
 @router.post("/", response_model=schemas.ReportageResponse)
 def create_reportage(
     reportage: schemas.ReportageCreate, 
     db: Session = Depends(get_db)
 ):
-    # Проверяем, существует ли event
-    event = db.query(models.Event).filter(
-        models.Event.id == reportage.event_id
-    ).first()
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
-    # Проверяем, существует ли correspondent
-    correspondent = db.query(models.Correspondent).filter(
-        models.Correspondent.id == reportage.correspondent_id
-    ).first()
-    if not correspondent:
-        raise HTTPException(status_code=404, detail="Correspondent not found")
-    
-    db_reportage = models.Reportage(**reportage.dict())
-    db.add(db_reportage)
-    db.commit()
-    db.refresh(db_reportage)
+    try:
+        row = db.execute(insert_reportage(reportage)).one()
+        db.commit()
+    except exc.IntegrityError as e:
+        db.rollback()
+        raise reference_error(e) or e
     
-    # Конвертируем дату и время в строки для ответа
-    return {
-        "id": db_reportage.id,
-        "date": str(db_reportage.date) if db_reportage.date else None,
-        "quality": db_reportage.quality,
-        "time": str(db_reportage.time) if db_reportage.time else None,
-        "video": db_reportage.video,
-        "event_id": db_reportage.event_id,
-        "correspondent_id": db_reportage.correspondent_id
-    }
-
-# READ ALL (с пагинацией)
-@router.get("/", response_model=List[schemas.ReportageResponse])
+    response_cache.invalidate("reportage", row.id)
+    return row._asdict()
+
+def check_references(db, rows, indexes, errors):
+    """Drop rows pointing at a missing event/correspondent (one lookup per table).
+
+    Only runs after the optimistic batch INSERT hit an FK violation, to tell
+    which items were at fault.
+    """
+    events = existing_ids(db, models.Event, [row["event_id"] for row in rows])
+    correspondents = existing_ids(
+        db, models.Correspondent, [row["correspondent_id"] for row in rows]
+    )
+
+    valid_rows, valid_indexes = [], []
+    for row, index in zip(rows, indexes):
+        if row["event_id"] not in events:
+            errors.append({"index": index, "detail": "Event not found"})
+        elif row["correspondent_id"] not in correspondents:
+            errors.append({"index": index, "detail": "Correspondent not found"})
+        else:
+            valid_rows.append(row)
+            valid_indexes.append(index)
+    return valid_rows, valid_indexes
+
+# BULK CREATE (JSON array or NDJSON body, one transaction, per-item errors)
+@router.post("/bulk", openapi_extra=BULK_OPENAPI)
+async def create_reportages_bulk(request: Request, db: Session = Depends(get_db)):
+    items = await read_items(request)
+    result = await run_in_threadpool(
+        bulk_create, db, items, schemas.ReportageCreate, models.Reportage,
+        check_references, reference_error
+    )
+    response_cache.invalidate("reportage", *created_ids(result))
+    return result
+
+# READ ALL (с пагинацией, ?expand=event,correspondent)
+@router.get("/", response_model=List[schemas.ReportageExpanded])
 def read_reportages(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,
+    expand: Optional[str] = EXPAND_QUERY,
     db: Session = Depends(get_db)
 ):
-    reportages = db.query(models.Reportage).offset(skip).limit(limit).all()
-    
-    # Конвертируем даты и время в строки
-    result = []
-    for reportage in reportages:
-        result.append({
-            "id": reportage.id,
-            "date": str(reportage.date) if reportage.date else None,
-            "quality": reportage.quality,
-            "time": str(reportage.time) if reportage.time else None,
-            "video": reportage.video,
-            "event_id": reportage.event_id,
-            "correspondent_id": reportage.correspondent_id
-        })
-    
-    return result
+    relations = parse_expand(expand)
+    if relations:
+        reportages = db.scalars(with_relations(
+            keyset_page(select(models.Reportage), models.Reportage.id, cursor, skip, limit), relations
+        )).all()
+        set_next_cursor(response, reportages, limit)
+        return rows_response(expanded_dicts(reportages, relations), response)
 
-# READ ONE
-@router.get("/{reportage_id}", response_model=schemas.ReportageResponse)
-def read_reportage(reportage_id: int, db: Session = Depends(get_db)):
-    reportage = db.query(models.Reportage).filter(
-        models.Reportage.id == reportage_id
-    ).first()
+    rows = db.execute(
+        keyset_page(REPORTAGE_ROWS, models.Reportage.id, cursor, skip, limit)
+    ).all()
+    set_next_cursor(response, rows, limit)
+    return rows_response(row_dicts(rows), response)
+
+# EXPORT (NDJSON or CSV, streamed; declared before /{reportage_id})
+@router.get("/export")
+def export_reportages(
+    format: str = Query("ndjson", description="ndjson or csv"),
+    gzip: bool = Query(False, description="gzip-compress the stream"),
+    event_id: Optional[int] = None,
+    correspondent_id: Optional[int] = None,
+    quality: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Stream all matching reportages from a server-side cursor"""
+    statement = reportages_export(event_id, correspondent_id, quality, date_from, date_to)
+    return export_response(
+        stream_export(statement, check_format(format), gzip), format, "reportages", gzip
+    )
+
+# READ ONE (?expand=event,correspondent)
+@router.get("/{reportage_id}", response_model=schemas.ReportageExpanded)
+def read_reportage(
+    reportage_id: int,
+    request: Request,
+    expand: Optional[str] = EXPAND_QUERY,
+    db: Session = Depends(get_db)
+):
+    relations = parse_expand(expand)
+    lookup = response_cache.lookup(request)
+    if lookup.hit is not None:
+        return lookup.hit
+    reportage = db.scalars(with_relations(
+        select(models.Reportage).where(models.Reportage.id == reportage_id), relations
+    )).first()
     if reportage is None:
         raise HTTPException(status_code=404, detail="Reportage not found")
     
-    return {
-        "id": reportage.id,
-        "date": str(reportage.date) if reportage.date else None,
-        "quality": reportage.quality,
-        "time": str(reportage.time) if reportage.time else None,
-        "video": reportage.video,
-        "event_id": reportage.event_id,
-        "correspondent_id": reportage.correspondent_id
-    }
+    if relations:
+        return lookup.store(expanded_dicts([reportage], relations)[0], expanded_tags(reportage, relations))
+    return lookup.store(reportage, [("reportage", reportage_id)], schemas.ReportageResponse)
 
 # UPDATE
 @router.put("/{reportage_id}", response_model=schemas.ReportageResponse)
@@ -99,42 +223,17 @@ def update_reportage(
     reportage_update: schemas.ReportageCreate,
     db: Session = Depends(get_db)
 ):
-    db_reportage = db.query(models.Reportage).filter(
-        models.Reportage.id == reportage_id
-    ).first()
-    if db_reportage is None:
+    try:
+        row = db.execute(update_reportage_row(reportage_id, reportage_update)).first()
+        db.commit()
+    except exc.IntegrityError as e:
+        db.rollback()
+        raise reference_error(e) or e
+    if row is None:
         raise HTTPException(status_code=404, detail="Reportage not found")
     
-    # Проверяем новые связи, если они изменились
-    if reportage_update.event_id != db_reportage.event_id:
-        event = db.query(models.Event).filter(
-            models.Event.id == reportage_update.event_id
-        ).first()
-        if not event:
-            raise HTTPException(status_code=404, detail="Event not found")
-    
-    if reportage_update.correspondent_id != db_reportage.correspondent_id:
-        correspondent = db.query(models.Correspondent).filter(
-            models.Correspondent.id == reportage_update.correspondent_id
-        ).first()
-        if not correspondent:
-            raise HTTPException(status_code=404, detail="Correspondent not found")
-    
-    for field, value in reportage_update.dict().items():
-        setattr(db_reportage, field, value)
-    
-    db.commit()
-    db.refresh(db_reportage)
-    
-    return {
-        "id": db_reportage.id,
-        "date": str(db_reportage.date) if db_reportage.date else None,
-        "quality": db_reportage.quality,
-        "time": str(db_reportage.time) if db_reportage.time else None,
-        "video": db_reportage.video,
-        "event_id": db_reportage.event_id,
-        "correspondent_id": db_reportage.correspondent_id
-    }
+    response_cache.invalidate("reportage", reportage_id)
+    return row._asdict()
 
 # DELETE
 @router.delete("/{reportage_id}")
@@ -147,4 +246,5 @@ def delete_reportage(reportage_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_reportage)
     db.commit()
+    response_cache.invalidate("reportage", reportage_id)
     return {"message": "Reportage deleted"}
\ No newline at end of file
@@ -0,0 +1,143 @@
+import json
+import os
+
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy import exc, insert, select
+
+from app.schemas import parse_temporal
+
+BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", "50000"))
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# request body is read by hand (JSON array or NDJSON), so describe it for /docs
+BULK_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"type": "array", "items": {"type": "object"}}},
+            "application/x-ndjson": {"schema": {"type": "string"}},
+        },
+    }
+}
+
+
+class InvalidLine(ValueError):
+    pass
+
+
+async def read_items(request: Request) -> list:
+    """Read a JSON array or an NDJSON body (one object per line) into a list.
+
+    Unparseable NDJSON lines are kept as InvalidLine so they are reported
+    against their index instead of failing the whole batch.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type in NDJSON_TYPES:
+        items = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                items.append(InvalidLine(f"Invalid JSON: {e}"))
+    else:
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many items (max {BULK_MAX_ITEMS} per request)"
+        )
+    return items
+
+
+def validate_items(items, schema):
+    """Validate every item against `schema`.
+
+    Returns the insertable rows, the request index of each row and a list
+    of per-item errors.
+    """
+    rows, indexes, errors = [], [], []
+    for index, item in enumerate(items):
+        if isinstance(item, InvalidLine):
+            errors.append({"index": index, "detail": str(item)})
+            continue
+        try:
+            rows.append(parse_temporal(schema.model_validate(item).dict()))
+        except ValidationError as e:
+            errors.append({"index": index, "detail": json.loads(e.json(include_url=False))})
+        except ValueError as e:
+            errors.append({"index": index, "detail": str(e)})
+        else:
+            indexes.append(index)
+    return rows, indexes, errors
+
+
+def existing_ids(db, model, ids):
+    """One round trip to find which of `ids` exist in `model`'s table."""
+    if not ids:
+        return set()
+    return set(db.scalars(select(model.id).where(model.id.in_(set(ids)))))
+
+
+def insert_rows(db, model, rows):
+    """Insert `rows` in one transaction as multi-row INSERT ... RETURNING id."""
+    if not rows:
+        return []
+    ids = db.scalars(
+        insert(model).returning(model.id, sort_by_parameter_order=True),
+        rows
+    ).all()
+    db.commit()
+    return ids
+
+
+def bulk_create(db, items, schema, model, check=None, error=None):
+    """Validate and insert `items` in one INSERT.
+
+    If that violates a constraint, `check(db, rows, indexes, errors)` finds
+    the offending rows (appending their errors) and the rest is inserted;
+    without a `check` the error propagates. If the retry fails as well (a row
+    changed between the check and the INSERT), `error(e)` maps it to an
+    HTTPException as single-item creates do, falling back to a 409.
+    """
+    rows, indexes, errors = validate_items(items, schema)
+    try:
+        ids = insert_rows(db, model, rows)
+    except exc.IntegrityError:
+        db.rollback()
+        if check is None:
+            raise
+        rows, indexes = check(db, rows, indexes, errors)
+        try:
+            ids = insert_rows(db, model, rows)
+        except exc.IntegrityError as e:
+            db.rollback()
+            raise (error(e) if error else None) or HTTPException(
+                status_code=409, detail="Batch conflicted with a concurrent write; retry it"
+            )
+    return bulk_result(indexes, ids, errors)
+
+
+def created_ids(result):
+    """Ids inserted by a bulk_create call, e.g. for cache invalidation."""
+    return [item["id"] for item in result["created"]]
+
+
+def bulk_result(indexes, ids, errors):
+    return {
+        "inserted": len(ids),
+        "failed": len(errors),
+        "created": [{"index": index, "id": id} for index, id in zip(indexes, ids)],
+        "errors": sorted(errors, key=lambda error: error["index"]),
+    }
@@ -0,0 +1,180 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Request, Response
+
+from app.serialization import FastJSONResponse
+
+CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_SIZE", "1024"))
+CACHE_TTL_SECONDS = float(os.environ.get("RESPONSE_CACHE_TTL", "30"))
+
+CACHE_STATUS_HEADER = "X-Cache"
+
+
+def cache_key(request: Request) -> tuple:
+    """Route path plus query parameters in a stable order."""
+    return request.url.path, tuple(sorted(request.query_params.multi_items()))
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "headers", "expires_at", "tags")
+
+    def __init__(self, body, etag, headers, expires_at, tags):
+        self.body = body
+        self.etag = etag
+        self.headers = headers
+        self.expires_at = expires_at
+        self.tags = tags
+
+    def to_response(self, request: Request, status: str) -> Response:
+        headers = {**self.headers, "ETag": self.etag, CACHE_STATUS_HEADER: status}
+        if etag_matches(request, self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+class CacheLookup:
+    """Result of ResponseCache.lookup: either a hit, or a way to store the miss."""
+
+    def __init__(self, cache, request, hit, version):
+        self.cache = cache
+        self.request = request
+        self.hit = hit
+        self.version = version
+
+    def store(self, content, tags, model=None, headers=None) -> Response:
+        """Render `content` (validated through `model` if given), cache it under `tags`, return it.
+
+        `tags` are (table, id) pairs the response depends on; (table, None)
+        means any row of the table.
+        """
+        if model is not None:
+            content = model.model_validate(content).model_dump(mode="json")
+        body = FastJSONResponse(content).body
+        entry = CachedResponse(
+            body, make_etag(body), headers or {},
+            time.monotonic() + self.cache.ttl, frozenset(tags)
+        )
+        self.cache.put(cache_key(self.request), entry, self.version)
+        return entry.to_response(self.request, "MISS")
+
+
+class ResponseCache:
+    """Bounded LRU of rendered JSON responses with a TTL and tag invalidation.
+
+    Per process: with several workers a write only invalidates its own
+    worker's entries, the TTL bounds how long the others serve old data.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._by_tag = {}
+        # bumped by every invalidation; a miss computed across one is not stored
+        self._version = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def lookup(self, request: Request) -> CacheLookup:
+        key = cache_key(request)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            version = self._version
+        hit = entry.to_response(request, "HIT") if entry is not None else None
+        return CacheLookup(self, request, hit, version)
+
+    def put(self, key, entry: CachedResponse, version: int):
+        if not self.enabled:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for tag in entry.tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, table: str, *ids):
+        """Drop responses that depend on rows `ids` of `table` or on the table as a whole."""
+        self._drop([(table, None), *((table, id) for id in ids)])
+
+    def invalidate_table(self, table: str):
+        """Drop every response that depends on any row of `table`."""
+        with self._lock:
+            tags = [tag for tag in self._by_tag if tag[0] == table]
+        self._drop(tags)
+
+    def _drop(self, tags):
+        with self._lock:
+            self._version += 1
+            for tag in tags:
+                for key in self._by_tag.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._by_tag.clear()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,72 @@
+from fastapi import HTTPException
+from sqlalchemy import func, select, text
+
+from app import models
+
+_correspondent = models.Correspondent
+
+LEADERBOARD_ORDERS = ("count", "spend")
+
+
+def check_order(by: str) -> str:
+    if by not in LEADERBOARD_ORDERS:
+        raise HTTPException(status_code=400, detail=f"by must be one of: {', '.join(LEADERBOARD_ORDERS)}")
+    return by
+
+
+def top_correspondents(by: str, specification=None, limit: int = 10, fresh: bool = False):
+    """Correspondents by reportage count or spend (count x price), highest first.
+
+    Reads the trigger-maintained reportage_count column, which the
+    ix_correspondent_reportage_count_id / ix_correspondent_spend_id indexes
+    serve in order; `fresh` counts reportages with a GROUP BY instead.
+    """
+    if fresh:
+        counts = select(
+            models.Reportage.correspondent_id, func.count().label("reportage_count")
+        ).group_by(models.Reportage.correspondent_id).subquery()
+        count = func.coalesce(counts.c.reportage_count, 0)
+    else:
+        count = _correspondent.reportage_count
+    spend = count * _correspondent.price
+
+    statement = select(
+        _correspondent.id,
+        _correspondent.name,
+        _correspondent.specification,
+        _correspondent.price,
+        count.label("reportage_count"),
+        spend.label("spend"),
+    )
+    if fresh:
+        statement = statement.outerjoin(counts, counts.c.correspondent_id == _correspondent.id)
+    if specification is not None:
+        statement = statement.where(_correspondent.specification == specification)
+
+    key = count.desc() if by == "count" else spend.desc().nulls_last()
+    return statement.order_by(key, _correspondent.id.desc()).limit(limit)
+
+
+def _reconcile(table: str, column: str) -> text:
+    return text(f"""
+        UPDATE {table} t SET reportage_count = coalesce(c.n, 0)
+        FROM {table} t2
+        LEFT JOIN (SELECT {column} AS id, count(*) AS n FROM reportage GROUP BY 1) c ON c.id = t2.id
+        WHERE t.id = t2.id AND t.reportage_count <> coalesce(c.n, 0)
+        RETURNING t.id
+    """)
+
+
+# repair counters that drifted (triggers disabled, manual SQL, replica-mode
+# loads); SHARE mode blocks reportage writes (not reads) until commit
+RECONCILE_LOCK = text("LOCK TABLE reportage IN SHARE MODE")
+RECONCILE_STATEMENTS = {
+    "events": _reconcile("events", "event_id"),
+    "correspondent": _reconcile("correspondent", "correspondent_id"),
+}
+
+
+def reconcile_counters(db) -> dict:
+    """Fix every drifted counter in the caller's transaction; ids repaired per table."""
+    db.execute(RECONCILE_LOCK)
+    return {table: db.execute(statement).scalars().all() for table, statement in RECONCILE_STATEMENTS.items()}
@@ -0,0 +1,162 @@
+import csv
+import io
+import json
+import os
+import zlib
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app import database, models
+
+# rows fetched per round trip from the server-side cursor, and per response chunk
+EXPORT_BATCH_ROWS = int(os.environ.get("EXPORT_BATCH_ROWS", "5000"))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def check_format(fmt: str) -> str:
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format '{fmt}', expected one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    return fmt
+
+
+def _date_range(statement, column, date_from, date_to):
+    if date_from is not None:
+        statement = statement.where(column >= date_from)
+    if date_to is not None:
+        statement = statement.where(column <= date_to)
+    return statement
+
+
+def events_export(city=None, danger=None, type=None, date_from=None, date_to=None):
+    """Plain column tuples (no ORM identity map) in id order."""
+    Event = models.Event
+    statement = select(
+        Event.id, Event.place, Event.city, Event.date, Event.duration,
+        Event.danger, Event.type, Event.extra_metadata
+    ).order_by(Event.id)
+    if city is not None:
+        statement = statement.where(Event.city == city)
+    if danger is not None:
+        statement = statement.where(Event.danger == danger)
+    if type is not None:
+        statement = statement.where(Event.type == type)
+    return _date_range(statement, Event.date, date_from, date_to)
+
+
+def reportages_export(event_id=None, correspondent_id=None, quality=None, date_from=None, date_to=None):
+    Reportage = models.Reportage
+    statement = select(
+        Reportage.id, Reportage.date, Reportage.quality, Reportage.time, Reportage.video,
+        Reportage.event_id, Reportage.correspondent_id
+    ).order_by(Reportage.id)
+    if event_id is not None:
+        statement = statement.where(Reportage.event_id == event_id)
+    if correspondent_id is not None:
+        statement = statement.where(Reportage.correspondent_id == correspondent_id)
+    if quality is not None:
+        statement = statement.where(Reportage.quality == quality)
+    return _date_range(statement, Reportage.date, date_from, date_to)
+
+
+def reportage_details_export(city=None, quality=None, date_from=None, date_to=None):
+    """Same fields as /queries/reportages_with_details."""
+    Reportage, Event, Correspondent = models.Reportage, models.Event, models.Correspondent
+    statement = select(
+        Reportage.id.label("reportage_id"),
+        Reportage.date.label("reportage_date"),
+        Reportage.quality,
+        Event.place.label("event_title"),
+        Event.city.label("event_city"),
+        Correspondent.name.label("correspondent_name"),
+        Correspondent.specification.label("correspondent_spec"),
+    ).join(
+        Event, Reportage.event_id == Event.id
+    ).join(
+        Correspondent, Reportage.correspondent_id == Correspondent.id
+    ).order_by(Reportage.id)
+    if city is not None:
+        statement = statement.where(Event.city == city)
+    if quality is not None:
+        statement = statement.where(Reportage.quality == quality)
+    return _date_range(statement, Reportage.date, date_from, date_to)
+
+
+class BatchEncoder:
+    """Turns batches of rows into NDJSON or CSV bytes, optionally gzip-compressed."""
+
+    def __init__(self, fmt, columns, compress=False):
+        self.fmt = fmt
+        self.columns = list(columns)
+        # wbits=31: gzip container, so the stream is a valid .gz file
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def _output(self, text: str) -> bytes:
+        data = text.encode()
+        if self.compressor is not None:
+            data = self.compressor.compress(data)
+        return data
+
+    def header(self) -> bytes:
+        if self.fmt == "csv":
+            return self._output(",".join(self.columns) + "\r\n")
+        return b""
+
+    def encode(self, rows) -> bytes:
+        if self.fmt == "ndjson":
+            return self._output("".join(
+                json.dumps(dict(zip(self.columns, row)), default=str, ensure_ascii=False) + "\n"
+                for row in rows
+            ))
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(
+            [json.dumps(value) if isinstance(value, (dict, list)) else value for value in row]
+            for row in rows
+        )
+        return self._output(buffer.getvalue())
+
+    def finish(self) -> bytes:
+        return self.compressor.flush() if self.compressor is not None else b""
+
+
+def stream_export(statement, fmt, compress):
+    """Generator of response chunks read through a server-side cursor.
+
+    Uses its own session, so the connection is held exactly as long as the
+    client keeps reading and is released if it disconnects.
+    """
+    encoder = BatchEncoder(fmt, statement.selected_columns.keys(), compress)
+    yield encoder.header()
+    with database.SessionLocal() as db:
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_ROWS))
+        for rows in result.partitions():
+            yield encoder.encode(rows)
+    yield encoder.finish()
+
+
+async def stream_export_async(statement, fmt, compress):
+    """stream_export for DB_MODE=async, over an asyncpg server-side cursor."""
+    encoder = BatchEncoder(fmt, statement.selected_columns.keys(), compress)
+    yield encoder.header()
+    async with database.AsyncSessionLocal() as db:
+        result = await db.stream(statement.execution_options(yield_per=EXPORT_BATCH_ROWS))
+        async for rows in result.partitions():
+            yield encoder.encode(rows)
+    yield encoder.finish()
+
+
+def export_response(chunks, fmt, name, compress) -> StreamingResponse:
+    headers = {"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=EXPORT_FORMATS[fmt], headers=headers)
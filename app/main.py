@@ -1,20 +1,44 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from app.database import DB_MODE
 from app.api.events import router as events_router
 from app.api.correspondents import router as correspondents_router
 from app.api.reportages import router as reportages_router
 from app.api.queries import router as queries_router
+from app.api.admin import router as admin_router
+from app.metrics import MetricsMiddleware, metrics
+from app.serialization import FastJSONResponse
 
 app = FastAPI(
     title="Reportage Management API",
     description="API for managing events, correspondents and reportages",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
+app.add_middleware(MetricsMiddleware)
 
-app.include_router(events_router)
-app.include_router(correspondents_router)
-app.include_router(reportages_router)
-app.include_router(queries_router)  
+if DB_MODE == "async":
+    from app.api.aio import merge_routers
+    from app.api.aio import events, correspondents, reportages, queries
+
+    app.include_router(merge_routers(events_router, events.router))
+    app.include_router(merge_routers(correspondents_router, correspondents.router))
+    app.include_router(merge_routers(reportages_router, reportages.router))
+    app.include_router(merge_routers(queries_router, queries.router))
+else:
+    app.include_router(events_router)
+    app.include_router(correspondents_router)
+    app.include_router(reportages_router)
+    app.include_router(queries_router)
+
+app.include_router(admin_router)
 
 @app.get("/")
 def root():
-    return {"message": "Reportage Management API is running"}
\ No newline at end of file
+    return {"message": "Reportage Management API is running", "db_mode": DB_MODE}
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Per-route latency, status and size metrics in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
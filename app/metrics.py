@@ -0,0 +1,253 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# seconds; 5ms..10s covers cached reads up to budgeted searches and exports
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# requests that matched no route share one label, so 404 scans cannot
+# blow up the series count
+UNMATCHED = "<unmatched>"
+
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+# statements slower than this are logged with their parameters and route (<= 0: off)
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "200"))
+# the same SELECT this many times in one request is reported as a likely N+1
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("N_PLUS_ONE_THRESHOLD", "5"))
+# adds X-DB-Queries / X-DB-Time-Ms / X-DB-Repeated to every response
+SQL_DEBUG_HEADERS = os.environ.get("SQL_DEBUG_HEADERS", "false").lower() in ("1", "true", "yes")
+
+logger = logging.getLogger("app.sql")
+
+
+class RequestTiming:
+    """Per-request SQL and rendering stats, shared with the threadpool through a context variable."""
+
+    __slots__ = ("scope", "db", "render", "queries", "selects")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.db = 0.0
+        self.render = 0.0
+        self.queries = 0
+        self.selects = Counter()
+
+    def repeated(self):
+        """[(statement, executions)] for SELECTs run at least N_PLUS_ONE_THRESHOLD times."""
+        return [
+            (statement, count) for statement, count in self.selects.most_common()
+            if count >= N_PLUS_ONE_THRESHOLD
+        ]
+
+
+request_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+# The start time lives on the execution context, which is discarded with the
+# statement. conn.info outlives it on the pooled connection, and
+# after_cursor_execute never fires for a failed statement (e.g. a statement_timeout).
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # internal statements SQLAlchemy runs without a context are not timed
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    timing = request_timing.get()
+    if timing is not None:
+        timing.db += elapsed
+        timing.queries += 1
+        # lazy loads are SELECTs; batched INSERTs legitimately repeat their statement
+        if statement.lstrip()[:6].upper() == "SELECT":
+            timing.selects[statement] += 1
+    if 0 < SLOW_QUERY_MS <= elapsed * 1000:
+        logger.warning(
+            "slow query %.1fms route=%s params=%.500r\n%s",
+            elapsed * 1000, route_label(timing.scope) if timing else "-", parameters, statement,
+        )
+
+
+class Histogram:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+
+def _labels(**labels) -> str:
+    # values are methods, status codes and our own route templates: nothing to escape
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels.items()) + "}"
+
+
+class Metrics:
+    """Per-route request counters and histograms, rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_progress = {}
+        self.requests = {}
+        self.latency = {}
+        self.db_latency = {}
+        self.queries = {}
+        self.sizes = {}
+
+    def started(self, method):
+        with self._lock:
+            self.in_progress[method] = self.in_progress.get(method, 0) + 1
+
+    def finished(self, method, route, status, seconds, timing, size):
+        key = (method, route)
+        with self._lock:
+            self.in_progress[method] -= 1
+            self.requests[method, route, status] = self.requests.get((method, route, status), 0) + 1
+            self._observe(self.latency, key, LATENCY_BUCKETS, seconds)
+            self._observe(self.db_latency, key, LATENCY_BUCKETS, timing.db)
+            self._observe(self.queries, key, QUERY_BUCKETS, timing.queries)
+            self._observe(self.sizes, key, SIZE_BUCKETS, size)
+
+    @staticmethod
+    def _observe(histograms, key, buckets, value):
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram(buckets)
+        histogram.counts[bisect_left(buckets, value)] += 1
+        histogram.sum += value
+
+    @staticmethod
+    def _render_histogram(lines, name, help_text, histograms, buckets):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (method, route), histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(buckets + ("+Inf",), histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(method=method, route=route, le=bound)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(method=method, route=route)} {histogram.sum}")
+            lines.append(f"{name}_count{_labels(method=method, route=route)} {cumulative}")
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP http_requests_in_progress Requests currently being served",
+                "# TYPE http_requests_in_progress gauge",
+            ]
+            for method, count in sorted(self.in_progress.items()):
+                lines.append(f"http_requests_in_progress{_labels(method=method)} {count}")
+
+            lines.append("# HELP http_requests_total Finished requests by route and status code")
+            lines.append("# TYPE http_requests_total counter")
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+            self._render_histogram(
+                lines, "http_request_duration_seconds", "Time from request to the last response byte",
+                self.latency, LATENCY_BUCKETS,
+            )
+            self._render_histogram(
+                lines, "http_request_db_duration_seconds", "Time spent executing SQL per request",
+                self.db_latency, LATENCY_BUCKETS,
+            )
+            self._render_histogram(
+                lines, "http_request_queries", "SQL statements executed per request",
+                self.queries, QUERY_BUCKETS,
+            )
+            self._render_histogram(
+                lines, "http_response_size_bytes", "Response body size",
+                self.sizes, SIZE_BUCKETS,
+            )
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def route_label(scope) -> str:
+    """The templated path (/events/{id}) of the route that served the request."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Starlette routes (docs, openapi.json) are fixed paths
+    if "endpoint" in scope:
+        return scope["path"]
+    return UNMATCHED
+
+
+def server_timing(timing: RequestTiming, total: float) -> bytes:
+    return (
+        f"db;dur={timing.db * 1000:.1f};desc=\"SQL\", "
+        f"serialize;dur={timing.render * 1000:.1f};desc=\"JSON rendering\", "
+        f"total;dur={total * 1000:.1f}"
+    ).encode("latin-1")
+
+
+def debug_headers(timing: RequestTiming) -> list:
+    repeated = timing.repeated()
+    return [
+        (b"x-db-queries", str(timing.queries).encode()),
+        (b"x-db-time-ms", f"{timing.db * 1000:.1f}".encode()),
+        (b"x-db-repeated", str(max((count for _, count in repeated), default=0)).encode()),
+    ]
+
+
+def report_repeated(method, route, timing: RequestTiming):
+    for statement, count in timing.repeated():
+        logger.warning("possible N+1: %s %s ran the same SELECT %d times\n%s", method, route, count, statement)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: per-route metrics plus a Server-Timing header.
+
+    Server-Timing is written when the response starts, so for streamed
+    responses it covers the time up to the first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        started = time.perf_counter()
+        timing = RequestTiming(scope)
+        token = request_timing.set(timing)
+        response = {"status": 500, "size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(timing, time.perf_counter() - started)))
+                if SQL_DEBUG_HEADERS:
+                    headers += debug_headers(timing)
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        metrics.started(method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_timing.reset(token)
+            route = route_label(scope)
+            metrics.finished(method, route, response["status"], time.perf_counter() - started, timing, response["size"])
+            report_repeated(method, route, timing)
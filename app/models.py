@@ -1,12 +1,53 @@
-from sqlalchemy import Column, Integer, String, Date, Time, Boolean, Numeric, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    BigInteger, Column, Integer, String, Date, DateTime, Time, Boolean, Numeric, ForeignKey, Index,
+    Computed, text
+)
+from sqlalchemy.orm import relationship, deferred
 from app.database import Base
 
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+
+# place/city weigh most, then type, then the string values of extra_metadata
+EVENT_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(place, '') || ' ' || coalesce(city, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(type, '')), 'B') || "
+    "setweight(jsonb_to_tsvector('english', coalesce(extra_metadata, '{}'::jsonb), '[\"string\"]'), 'C')"
+)
 
 class Event(Base):
     __tablename__ = "events"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # trigram index behind the ilike/regex search endpoints (see app/search.py)
+        Index(
+            "ix_events_extra_metadata_trgm",
+            text("(extra_metadata::text) gin_trgm_ops"),
+            postgresql_using="gin"
+        ),
+        Index("ix_events_search_vector", "search_vector", postgresql_using="gin"),
+        # containment / jsonpath filters of /queries/events_by_metadata
+        Index(
+            "ix_events_extra_metadata_path_ops",
+            "extra_metadata",
+            postgresql_using="gin",
+            postgresql_ops={"extra_metadata": "jsonb_path_ops"}
+        ),
+        # numeric hot key, same expression as app.search.metadata_number("attendance")
+        Index(
+            "ix_events_metadata_attendance",
+            text(
+                "(CASE WHEN jsonb_typeof(extra_metadata -> 'attendance') = 'number' "
+                "THEN (extra_metadata ->> 'attendance')::numeric END)"
+            )
+        ),
+        # /queries/events_by_city_and_danger and the keyset sorts of /queries/sorted_events
+        Index("ix_events_city_danger_duration", "city", "danger", "duration"),
+        Index("ix_events_date_id", "date", "id"),
+        Index("ix_events_duration_id", "duration", "id"),
+        Index("ix_events_city_id", "city", "id"),
+        # per-city min/max duration lookups of the event_city_stats triggers
+        Index("ix_events_city_duration", "city", "duration"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     place = Column(String(100))
@@ -16,12 +57,23 @@ class Event(Base):
     danger = Column(String(50))
     type = Column(String(100))
     extra_metadata = Column(JSONB, nullable=True) 
+    # reportages pointing here, maintained by statement triggers on reportage
+    reportage_count = Column(Integer, nullable=False, server_default="0")
+    # maintained by Postgres, deferred so it is never loaded into responses
+    search_vector = deferred(Column(TSVECTOR, Computed(EVENT_SEARCH_VECTOR, persisted=True)))
     
     reportages = relationship("Reportage", back_populates="event")
 
 class Correspondent(Base):
     __tablename__ = "correspondent"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # WHERE operator AND price >= ? of /queries/increase_operator_prices
+        Index("ix_correspondent_operator_price", "price", postgresql_where=text("operator")),
+        # /queries/top_correspondents, read backwards / in order
+        Index("ix_correspondent_reportage_count_id", "reportage_count", "id"),
+        Index("ix_correspondent_spend_id", text("(reportage_count * price) DESC NULLS LAST"), text("id DESC")),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50))
@@ -30,20 +82,42 @@ class Correspondent(Base):
     specification = Column(String(50))
     operator = Column(Boolean)
     price = Column(Numeric(10, 2))
+    # reportages by this correspondent, maintained by statement triggers on reportage
+    reportage_count = Column(Integer, nullable=False, server_default="0")
     
     reportages = relationship("Reportage", back_populates="correspondent")
 
 class Reportage(Base):
     __tablename__ = "reportage"
-    __table_args__ = {'extend_existing': True}
+    # monthly range partitions by date (app/partitions.py); the primary key
+    # has to include the partition key, so it is (id, date) in the database
+    __table_args__ = {'extend_existing': True, 'postgresql_partition_by': 'RANGE (date)'}
 
-    id = Column(Integer, primary_key=True, index=True)
-    date = Column(Date)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(Date, primary_key=True)
     quality = Column(String(50))
     time = Column(Time)
     video = Column(Boolean)
-    event_id = Column(Integer, ForeignKey("events.id"))
-    correspondent_id = Column(Integer, ForeignKey("correspondent.id"))
+    event_id = Column(Integer, ForeignKey("events.id"), index=True)
+    correspondent_id = Column(Integer, ForeignKey("correspondent.id"), index=True)
     
     event = relationship("Event", back_populates="reportages")
-    correspondent = relationship("Correspondent", back_populates="reportages")
\ No newline at end of file
+    correspondent = relationship("Correspondent", back_populates="reportages")
+
+    # ids are still unique (one sequence), so the ORM identity stays id alone
+    __mapper_args__ = {"primary_key": [id]}
+
+
+class EventCityStats(Base):
+    """Per-city rollup of events, kept current by statement triggers on events."""
+    __tablename__ = "event_city_stats"
+    __table_args__ = {'extend_existing': True}
+
+    # '' stands for events without a city
+    city = Column(String(100), primary_key=True)
+    total_events = Column(BigInteger, nullable=False)
+    duration_count = Column(BigInteger, nullable=False)
+    duration_sum = Column(BigInteger, nullable=False)
+    min_duration = Column(Integer)
+    max_duration = Column(Integer)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,89 @@
+import base64
+import json
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(**values) -> str:
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(values, dict) or not isinstance(values.get("id"), int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def keyset_page(query, id_column, cursor=None, skip=0, limit=100):
+    """Page `query` (a Query or a select()) by id.
+
+    With a cursor the page starts right after the last seen id, so the cost
+    does not grow with depth; `skip` is only honoured for old clients that
+    do not send one.
+    """
+    query = query.order_by(id_column)
+    if cursor:
+        query = query.filter(id_column > decode_cursor(cursor)["id"])
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def keyset_sorted_page(query, sort_field, id_column, descending, cursor=None, parse=None, limit=100):
+    """Page `query` ordered by (sort_field, id) with NULL sort values last for asc, first for desc."""
+    if descending:
+        query = query.order_by(sort_field.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_field.asc(), id_column.asc())
+
+    if cursor:
+        values = decode_cursor(cursor)
+        last_id, last_key = values["id"], values.get("key")
+        if last_key is not None and parse is not None:
+            # a tampered key, or a cursor from another sort_by
+            try:
+                last_key = parse(last_key)
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        if descending and last_key is None:
+            condition = or_(
+                and_(sort_field.is_(None), id_column < last_id),
+                sort_field.isnot(None)
+            )
+        elif descending:
+            condition = tuple_(sort_field, id_column) < tuple_(last_key, last_id)
+        elif last_key is None:
+            condition = and_(sort_field.is_(None), id_column > last_id)
+        else:
+            condition = or_(
+                tuple_(sort_field, id_column) > tuple_(last_key, last_id),
+                sort_field.is_(None)
+            )
+        query = query.filter(condition)
+
+    return query.limit(limit)
+
+
+def set_next_cursor(response: Response, rows, limit, **key):
+    """Expose the cursor of the next page in the X-Next-Cursor header.
+
+    `key` maps cursor fields to callables reading them from the last row;
+    by default the row's `id`. No header means there is no next page.
+    """
+    if len(rows) < limit or not rows:
+        return
+    last = rows[-1]
+    key = key or {"id": lambda row: row.id}
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+        **{name: getter(last) for name, getter in key.items()}
+    )
@@ -0,0 +1,85 @@
+import os
+import re
+from datetime import date
+
+from sqlalchemy import text
+
+# monthly partitions kept ready beyond the current month
+PARTITIONS_AHEAD = int(os.environ.get("REPORTAGE_PARTITIONS_AHEAD", "3"))
+
+DEFAULT_PARTITION = "reportage_default"
+
+_BOUND = re.compile(r"FROM \('([\d-]+)'\) TO \('([\d-]+)'\)")
+
+
+def add_months(day: date, months: int) -> date:
+    """First day of the month `months` after day's month."""
+    years, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + years, month + 1, 1)
+
+
+def ensure_partitions(connection, first: date, last: date) -> int:
+    """Create the missing monthly partitions from first's month to last's; how many were created.
+
+    Rows already in the default partition for those months are moved over
+    (see reportage_ensure_partitions() in the partitioning migration).
+    """
+    return connection.execute(
+        text("SELECT reportage_ensure_partitions(:first, :last)"),
+        {"first": first.replace(day=1), "last": last.replace(day=1)}
+    ).scalar()
+
+
+def ensure_upcoming(connection, ahead: int = PARTITIONS_AHEAD) -> int:
+    today = date.today()
+    return ensure_partitions(connection, today, add_months(today, ahead))
+
+
+def list_partitions(connection) -> list:
+    """Partitions of reportage in date order; the default partition has no bounds."""
+    rows = connection.execute(text("""
+        SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound,
+               c.reltuples::bigint AS estimated_rows, pg_total_relation_size(c.oid) AS bytes
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'reportage'::regclass
+    """)).all()
+    partitions = []
+    for row in rows:
+        bound = _BOUND.search(row.bound)
+        partitions.append({
+            "name": row.name,
+            "from": date.fromisoformat(bound.group(1)) if bound else None,
+            "to": date.fromisoformat(bound.group(2)) if bound else None,
+            "estimated_rows": max(row.estimated_rows, 0),
+            "bytes": row.bytes,
+        })
+    return sorted(partitions, key=lambda p: (p["from"] is None, p["from"] or date.min))
+
+
+def expired_partitions(connection, cutoff: date) -> list:
+    """Names of the partitions holding only dates before `cutoff`."""
+    return [p["name"] for p in list_partitions(connection) if p["to"] is not None and p["to"] <= cutoff]
+
+
+def detach_partition(engine, name: str, keep: bool = False, lock_timeout_ms: int = 5000) -> int:
+    """Detach one partition, take its rows off the reportage counters, then drop it (unless `keep`).
+
+    DETACH only needs a brief lock on reportage (it is a catalog change), and
+    lock_timeout keeps it from queueing behind long reports. The counter
+    update runs on the detached table, outside that lock. Returns the rows removed.
+    """
+    with engine.begin() as connection:
+        connection.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+        connection.execute(text(f'ALTER TABLE reportage DETACH PARTITION "{name}"'))
+
+    with engine.begin() as connection:
+        for table, column in (("events", "event_id"), ("correspondent", "correspondent_id")):
+            connection.execute(text(f"""
+                UPDATE {table} t SET reportage_count = t.reportage_count - c.n
+                FROM (SELECT {column} AS id, count(*) AS n FROM "{name}" GROUP BY 1) c
+                WHERE t.id = c.id
+            """))
+        rows = connection.execute(text(f'SELECT count(*) FROM "{name}"')).scalar()
+        if not keep:
+            connection.execute(text(f'DROP TABLE "{name}"'))
+    return rows
@@ -1,6 +1,20 @@
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, Dict, Any
-import json
+from datetime import date, datetime, time
+
+
+def parse_temporal(data: dict) -> dict:
+    """Turn the 'date'/'time' strings of a dumped schema into date/time objects.
+
+    asyncpg, unlike psycopg2, will not cast strings to DATE/TIME parameters,
+    and parsing up front lets bulk ingestion reject bad values per item.
+    """
+    if isinstance(data.get('date'), str):
+        data['date'] = date.fromisoformat(data['date'])
+    if isinstance(data.get('time'), str):
+        fmt = "%H:%M:%S" if data['time'].count(":") == 2 else "%H:%M"
+        data['time'] = datetime.strptime(data['time'], fmt).time()
+    return data
 
 class EventCreate(BaseModel):
     place: str
@@ -12,34 +26,18 @@ class EventCreate(BaseModel):
     extra_metadata: Optional[Dict[str, Any]] = None
     
     model_config = ConfigDict(from_attributes=True)
-    
-    def dict(self, **kwargs):
-        data = super().dict(**kwargs)
-        if data.get('extra_metadata'):
-            data['extra_metadata'] = json.dumps(data['extra_metadata'])
-        return data
 
 class EventResponse(BaseModel):
     id: int
     place: str
     city: str
-    date: str
+    date: date
     duration: int
     danger: str
     type: str
     extra_metadata: Optional[Dict[str, Any]] = None
     
     model_config = ConfigDict(from_attributes=True)
-    
-    @field_validator('extra_metadata', mode='before')
-    @classmethod
-    def parse_json(cls, v):
-        if isinstance(v, str):
-            try:
-                return json.loads(v)
-            except:
-                return None
-        return v
 
 class CorrespondentCreate(BaseModel):
     name: str
@@ -65,4 +63,11 @@ class ReportageCreate(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 class ReportageResponse(ReportageCreate):
-    id: int
\ No newline at end of file
+    id: int
+    date: date
+    time: time
+
+class ReportageExpanded(ReportageResponse):
+    """ReportageResponse with the relations asked for in ?expand= inlined."""
+    event: Optional[EventResponse] = None
+    correspondent: Optional[CorrespondentResponse] = None
@@ -0,0 +1,329 @@
+import json
+import os
+import re
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+from fastapi import HTTPException
+from sqlalchemy import Numeric, Text, and_, cast, func, literal, literal_column, not_, select
+from sqlalchemy.dialects.postgresql import JSONB, JSONPATH, REGCONFIG
+
+from app import models
+
+# Must stay the same expression as the ix_events_extra_metadata_trgm index
+# (extra_metadata::text gin_trgm_ops), otherwise the planner cannot use it.
+METADATA_TEXT = models.Event.extra_metadata.cast(Text)
+
+# text search configuration of models.EVENT_SEARCH_VECTOR
+SEARCH_CONFIG = cast("english", REGCONFIG)
+
+# matches ranked per search; bounds ts_rank work for very common terms
+SEARCH_MAX_CANDIDATES = int(os.environ.get("SEARCH_MAX_CANDIDATES", "10000"))
+
+HEADLINE_OPTIONS = "StartSel=<b>, StopSel=</b>, MaxFragments=2, MaxWords=20, MinWords=5"
+
+# string values of extra_metadata at any depth, joined for ts_headline
+METADATA_STRINGS = literal_column(
+    "(SELECT string_agg(v #>> '{}', ' ') "
+    "FROM jsonb_path_query(events.extra_metadata, '$.** ? (@.type() == \"string\")') AS v)"
+)
+
+
+def escape_like(value: str) -> str:
+    """Make %, _ and \\ in user input match literally inside a LIKE pattern."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def metadata_contains(q: str):
+    """extra_metadata::text ILIKE '%q%' (trigram index scan for 3+ characters)"""
+    return METADATA_TEXT.ilike(f"%{escape_like(q)}%", escape="\\")
+
+
+def metadata_matches(pattern: str, case_sensitive: bool = True):
+    """extra_metadata::text ~ pattern / ~* pattern (trigram index scan when the
+    pattern has literal runs of 3+ characters)"""
+    return METADATA_TEXT.op("~" if case_sensitive else "~*")(pattern)
+
+
+MAX_PATTERN_LENGTH = 500
+
+
+def validate_pattern(pattern: str):
+    if not pattern.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Pattern cannot be empty"
+        )
+
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Pattern too long (max {MAX_PATTERN_LENGTH} characters)"
+        )
+
+
+def nested_bracket(pattern: str) -> bool:
+    """Whether a bracket expression in `pattern` contains '['.
+
+    Postgres reads [[:digit:]], [[.hyphen.]] and [[=e=]] as one bracket
+    expression; Python ends the set at the first ']' and takes the rest as
+    literals, so the two disagree on where the brackets stop.
+    """
+    i, inside = 0, False
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if inside:
+            if char == "[":
+                return True
+            inside = char != "]"
+        elif char == "[":
+            inside = True
+            # a leading ']' (after an optional '^') is a member, not the end
+            i += 1
+            if pattern.startswith("^", i):
+                i += 1
+            if pattern.startswith("]", i):
+                i += 1
+            continue
+        i += 1
+    return False
+
+
+def required_literal(pattern: str):
+    """Longest run of plain characters every match of `pattern` must contain.
+
+    Only top-level literals count (anything optional, repeated or inside an
+    alternation breaks the run). Returns None when the pattern cannot be
+    analysed, e.g. Postgres-only escapes like \\y, embedded options or
+    bracket expressions Python parses differently (see nested_bracket()).
+    """
+    if pattern.startswith(("(?", "***")) or nested_bracket(pattern):
+        return None
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, OverflowError, RecursionError):
+        return None
+
+    best, run = "", []
+    for op, value in list(parsed) + [(None, None)]:
+        if op is sre_parse.LITERAL:
+            run.append(chr(value))
+        else:
+            best = max(best, "".join(run), key=len)
+            run = []
+    return best or None
+
+
+def metadata_regex(pattern: str, case_sensitive: bool = True):
+    """metadata_matches() behind an ILIKE on the pattern's required literal.
+
+    pg_trgm cannot extract trigrams from every regex; the ILIKE always can,
+    so the index narrows the candidates before the regex runs on them.
+    ILIKE is case-insensitive, so it never drops a real match in either mode.
+    """
+    condition = metadata_matches(pattern, case_sensitive)
+    literal_run = required_literal(pattern)
+    if literal_run and len(literal_run) >= 3:
+        return and_(metadata_contains(literal_run), condition)
+    return condition
+
+
+# keys with a numeric expression index (ix_events_metadata_<key>); comparisons
+# on them use metadata_number() so the planner can use that index
+INDEXED_NUMBER_KEYS = ("attendance",)
+
+METADATA_OPERATORS = {
+    "eq": None,
+    "ne": None,
+    "exists": None,
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+}
+
+
+def metadata_number(key: str):
+    """Numeric value of a hot key, NULL when it is missing or not a number.
+
+    Same expression as its index in models.Event; `key` must come from
+    INDEXED_NUMBER_KEYS, never from user input.
+    """
+    return literal_column(
+        f"(CASE WHEN jsonb_typeof(extra_metadata -> '{key}') = 'number' "
+        f"THEN (extra_metadata ->> '{key}')::numeric END)",
+        Numeric
+    )
+
+
+def jsonpath_key(key: str) -> str:
+    """$."key" with the key quoted as a jsonpath string literal"""
+    return "$." + json.dumps(key)
+
+
+def parse_metadata_value(raw: str):
+    """JSON literals (1000, 2.5, true, null, "42") keep their type, anything else is a string."""
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def parse_metadata_filter(raw: str):
+    """'key:op:value' (or 'key:exists') -> (key, op, value)"""
+    parts = raw.split(":", 2)
+    if len(parts) == 2 and parts[1] == "exists":
+        parts.append(None)
+    if len(parts) != 3 or not parts[0] or parts[1] not in METADATA_OPERATORS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid filter '{raw}', expected key:op:value with op in "
+                   f"{', '.join(METADATA_OPERATORS)}"
+        )
+
+    key, op, value = parts
+    if op != "exists":
+        value = parse_metadata_value(value)
+        if op in ("gt", "gte", "lt", "lte") and (
+            isinstance(value, bool) or not isinstance(value, (int, float))
+        ):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Filter '{raw}': {op} needs a numeric value"
+            )
+    return key, op, value
+
+
+def metadata_conditions(filters):
+    """Compile parsed filters into WHERE conditions on extra_metadata.
+
+    All `eq` filters become a single `extra_metadata @> {...}` containment and
+    `exists` becomes `extra_metadata @? '$."key"'`, both served by the GIN
+    jsonb_path_ops index. Numeric comparisons use jsonb_path_exists, or the
+    expression index for INDEXED_NUMBER_KEYS.
+    """
+    conditions = []
+    contains = {}
+
+    for key, op, value in filters:
+        if op == "eq":
+            contains[key] = value
+        elif op == "ne":
+            conditions.append(not_(models.Event.extra_metadata.contains({key: value})))
+        elif op == "exists":
+            conditions.append(
+                models.Event.extra_metadata.op("@?")(cast(jsonpath_key(key), JSONPATH))
+            )
+        elif key in INDEXED_NUMBER_KEYS:
+            conditions.append(metadata_number(key).op(METADATA_OPERATORS[op])(literal(value, Numeric)))
+        else:
+            conditions.append(func.jsonb_path_exists(
+                models.Event.extra_metadata,
+                cast(f"{jsonpath_key(key)} ? (@ {METADATA_OPERATORS[op]} $value)", JSONPATH),
+                literal({"value": value}, JSONB)
+            ))
+
+    if contains:
+        conditions.insert(0, models.Event.extra_metadata.contains(contains))
+    return conditions
+
+
+# total=exact|estimate|none on the search endpoints
+TOTAL_MODES = ("exact", "estimate", "none")
+
+# `estimate` counts at most this many matches and reports "1000+" beyond it
+TOTAL_ESTIMATE_CAP = int(os.environ.get("TOTAL_ESTIMATE_CAP", "1000"))
+
+
+def search_page(condition, limit: int, offset: int, total_mode: str = "exact"):
+    """One page of events matching `condition`.
+
+    In exact mode every row also carries count(*) OVER (), so the filter runs
+    once for both the page and the total instead of twice.
+    """
+    query = select(models.Event).where(condition).offset(offset).limit(limit)
+    if total_mode == "exact":
+        query = query.add_columns(func.count().over().label("total"))
+    return query
+
+
+def split_total(rows, total_mode: str, offset: int, limit: int):
+    """(events, total) from search_page rows; total is None if it still has to be counted.
+
+    A page shorter than `limit` already tells the exact total, whatever the mode.
+    """
+    events = [row[0] for row in rows]
+    if total_mode == "none":
+        return events, None
+    if total_mode == "exact" and rows:
+        return events, rows[0].total
+    if len(rows) < limit and (rows or offset == 0):
+        return events, offset + len(rows)
+    return events, None
+
+
+def total_query(condition, total_mode: str):
+    """Count for pages that could not tell their own total (None for total=none)."""
+    if total_mode == "exact":
+        return select(func.count()).select_from(models.Event).where(condition)
+    if total_mode == "estimate":
+        capped = select(models.Event.id).where(condition).limit(TOTAL_ESTIMATE_CAP + 1)
+        return select(func.count()).select_from(capped.subquery())
+    return None
+
+
+def search_with_total(db, condition, limit: int, offset: int, total_mode: str):
+    """(events, total) for a search condition on a sync session."""
+    rows = db.execute(search_page(condition, limit, offset, total_mode)).all()
+    results, count = split_total(rows, total_mode, offset, limit)
+    if count is None and total_mode != "none":
+        count = db.scalar(total_query(condition, total_mode))
+    return results, count
+
+
+def format_total(count, total_mode: str):
+    if total_mode == "estimate" and count is not None and count > TOTAL_ESTIMATE_CAP:
+        return f"{TOTAL_ESTIMATE_CAP}+"
+    return count
+
+
+def ranked_search(q: str, limit: int, offset: int = 0, highlight: bool = True):
+    """Events matching websearch_to_tsquery(q), best ts_rank first.
+
+    Matching uses the GIN index on search_vector. Only the newest
+    SEARCH_MAX_CANDIDATES matches (highest ids) are ranked, so above the cap
+    the results are approximate but the same on every run. ts_headline only
+    runs on the final page. Rows are (Event, rank) or (Event, rank, snippet).
+    """
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+    candidates = select(
+        models.Event.id, models.Event.search_vector
+    ).where(
+        models.Event.search_vector.op("@@")(tsquery)
+    ).order_by(models.Event.id.desc()).limit(SEARCH_MAX_CANDIDATES).subquery()
+
+    # ts_rank runs on the capped candidates only
+    rank = func.ts_rank(candidates.c.search_vector, tsquery).label("rank")
+    page = select(candidates.c.id, rank).order_by(
+        rank.desc(), candidates.c.id
+    ).offset(offset).limit(limit).subquery()
+
+    columns = [models.Event, page.c.rank]
+    if highlight:
+        document = func.concat_ws(
+            " ", models.Event.place, models.Event.city, models.Event.type, METADATA_STRINGS
+        )
+        columns.append(
+            func.ts_headline(SEARCH_CONFIG, document, tsquery, HEADLINE_OPTIONS).label("snippet")
+        )
+
+    return select(*columns).join(
+        page, page.c.id == models.Event.id
+    ).order_by(page.c.rank.desc(), models.Event.id)
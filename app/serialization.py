@@ -0,0 +1,65 @@
+import time
+from decimal import Decimal
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+
+from app import models
+from app.metrics import request_timing
+
+# column tuples instead of ORM entities: no identity map, no instance state
+EVENT_COLUMNS = (
+    models.Event.id, models.Event.place, models.Event.city, models.Event.date,
+    models.Event.duration, models.Event.danger, models.Event.type, models.Event.extra_metadata,
+)
+CORRESPONDENT_COLUMNS = (
+    models.Correspondent.id, models.Correspondent.name, models.Correspondent.country,
+    models.Correspondent.city, models.Correspondent.specification,
+    models.Correspondent.operator, models.Correspondent.price,
+)
+REPORTAGE_COLUMNS = (
+    models.Reportage.id, models.Reportage.date, models.Reportage.quality, models.Reportage.time,
+    models.Reportage.video, models.Reportage.event_id, models.Reportage.correspondent_id,
+)
+
+EVENT_ROWS = select(*EVENT_COLUMNS)
+CORRESPONDENT_ROWS = select(*CORRESPONDENT_COLUMNS)
+REPORTAGE_ROWS = select(*REPORTAGE_COLUMNS)
+
+
+def _default(value):
+    # Numeric columns; the response schemas declare them as float
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson rendering; dates, times and datetimes are written natively."""
+
+    def render(self, content) -> bytes:
+        started = time.perf_counter()
+        body = orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        timing = request_timing.get()
+        if timing is not None:
+            timing.render += time.perf_counter() - started
+        return body
+
+
+def row_dicts(rows) -> list:
+    if not rows:
+        return []
+    keys = rows[0]._fields
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def rows_response(items: list, response: Response = None) -> FastJSONResponse:
+    """Return already-shaped dicts without response_model validation.
+
+    Headers set on the handler's injected `response` (e.g. X-Next-Cursor)
+    are carried over, since FastAPI ignores it once a Response is returned.
+    """
+    headers = dict(response.headers) if response is not None else None
+    return FastJSONResponse(items, headers=headers)
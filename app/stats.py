@@ -0,0 +1,62 @@
+from sqlalchemy import func, select, text
+
+from app import models
+
+STATS_SOURCE_HEADER = "X-Stats-Source"
+STATS_UPDATED_HEADER = "X-Stats-Updated-At"
+
+_stats = models.EventCityStats
+
+# one row per city: O(#cities) instead of a scan of events
+ROLLUP_STATS = select(
+    func.nullif(_stats.city, "").label("city"),
+    _stats.total_events,
+    (_stats.duration_sum / func.nullif(_stats.duration_count, 0)).label("avg_duration"),
+    _stats.min_duration,
+    _stats.max_duration,
+    _stats.updated_at,
+).order_by(_stats.city)
+
+# ?fresh=true: the original GROUP BY over events
+LIVE_STATS = select(
+    models.Event.city,
+    func.count(models.Event.id).label("total_events"),
+    func.avg(models.Event.duration).label("avg_duration"),
+    func.min(models.Event.duration).label("min_duration"),
+    func.max(models.Event.duration).label("max_duration"),
+).group_by(models.Event.city)
+
+# recompute the rollup from scratch, e.g. after a TRUNCATE or manual repair;
+# SHARE mode blocks event writes (not reads) until the transaction commits
+REBUILD_STATEMENTS = (
+    text("LOCK TABLE events IN SHARE MODE"),
+    text("DELETE FROM event_city_stats"),
+    text("""
+        INSERT INTO event_city_stats
+            (city, total_events, duration_count, duration_sum, min_duration, max_duration)
+        SELECT coalesce(city, ''), count(*), count(duration), coalesce(sum(duration), 0),
+               min(duration), max(duration)
+        FROM events GROUP BY 1
+    """),
+)
+
+
+def format_stats(rows):
+    return [
+        {
+            "city": row.city,
+            "total_events": row.total_events,
+            "avg_duration": float(row.avg_duration) if row.avg_duration else 0,
+            "min_duration": row.min_duration,
+            "max_duration": row.max_duration,
+        }
+        for row in rows
+    ]
+
+
+def stats_headers(rows, fresh: bool) -> dict:
+    """Say where the numbers came from and, for the rollup, when it last changed."""
+    headers = {STATS_SOURCE_HEADER: "live" if fresh else "rollup"}
+    if not fresh and rows:
+        headers[STATS_UPDATED_HEADER] = max(row.updated_at for row in rows).isoformat()
+    return headers
@@ -0,0 +1,115 @@
+import asyncio
+import os
+import time
+
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import exc, func, select
+
+# statement_timeout budget per endpoint, in milliseconds
+STATEMENT_TIMEOUTS_MS = {
+    "fulltext_search_events": int(os.environ.get("SEARCH_TIMEOUT_MS", "3000")),
+    "regex_search_events": int(os.environ.get("REGEX_TIMEOUT_MS", "2000")),
+    "search_events_json": int(os.environ.get("REGEX_TIMEOUT_MS", "2000")),
+}
+
+# how often a running query checks whether its client went away
+DISCONNECT_POLL_SECONDS = 0.1
+
+QUERY_CANCELED = "57014"
+
+
+def statement_timeout(timeout_ms: int):
+    """SELECT set_config('statement_timeout', ..., true): applies to the rest of the transaction."""
+    return select(func.set_config("statement_timeout", str(timeout_ms), True))
+
+
+def is_query_canceled(error: Exception) -> bool:
+    """Postgres cancelled the statement (statement_timeout or a cancel request)."""
+    return isinstance(error, exc.DBAPIError) and getattr(error.orig, "pgcode", None) == QUERY_CANCELED
+
+
+def timeout_error(timeout_ms: int, started: float) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail={
+            "message": "Query exceeded its time budget and was cancelled",
+            "timeout_ms": timeout_ms,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    )
+
+
+def client_gone_error() -> HTTPException:
+    # nobody reads this response; 499 mirrors nginx's "client closed request"
+    return HTTPException(status_code=499, detail="Client disconnected, query cancelled")
+
+
+async def _until_done_or_disconnected(request: Request, task: asyncio.Future) -> bool:
+    """Wait for `task`; True if the client disconnected first."""
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+        if done:
+            return False
+        if await request.is_disconnected():
+            return True
+
+
+async def run_with_budget(request: Request, db, timeout_ms: int, fn, *args):
+    """Run fn(db, *args) on the threadpool under a statement_timeout.
+
+    If the client disconnects meanwhile, the running statement is cancelled
+    on the server through the psycopg2 connection.
+    """
+    started = time.perf_counter()
+    raw = {}
+
+    def call():
+        raw["connection"] = db.connection().connection.dbapi_connection
+        db.execute(statement_timeout(timeout_ms))
+        return fn(db, *args)
+
+    task = asyncio.ensure_future(run_in_threadpool(call))
+    disconnected = await _until_done_or_disconnected(request, task)
+    if disconnected and "connection" in raw:
+        raw["connection"].cancel()
+
+    try:
+        result = await task
+    except exc.DBAPIError as e:
+        if disconnected:
+            raise client_gone_error()
+        if is_query_canceled(e):
+            raise timeout_error(timeout_ms, started)
+        raise
+    if disconnected:
+        raise client_gone_error()
+    return result
+
+
+async def run_with_budget_async(request: Request, db, timeout_ms: int, fn, *args):
+    """Async-session counterpart of run_with_budget: await fn(db, *args).
+
+    Cancelling the task on disconnect makes asyncpg cancel the statement.
+    """
+    started = time.perf_counter()
+
+    async def call():
+        await db.execute(statement_timeout(timeout_ms))
+        return await fn(db, *args)
+
+    task = asyncio.ensure_future(call())
+    if await _until_done_or_disconnected(request, task):
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, exc.DBAPIError):
+            pass
+        raise client_gone_error()
+
+    try:
+        return await task
+    except exc.DBAPIError as e:
+        if is_query_canceled(e):
+            raise timeout_error(timeout_ms, started)
+        raise
@@ -0,0 +1,98 @@
+# compare.py
+# Flags regressions between two run.py results.
+#
+#   python scripts/bench/compare.py baseline.json candidate.json --threshold 10
+#
+# A route regresses when its p95 (or p99, with --p99) grows, or its
+# throughput drops, by more than --threshold percent, or when its error rate
+# (5xx and transport errors per request) rises by more than --error-threshold
+# percentage points. Exits 1 if anything regressed, so it can gate CI.
+import argparse
+import sys
+
+from report import load
+
+# routes with fewer samples are too noisy to judge
+MIN_REQUESTS = 50
+
+
+def change(before, after):
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def error_rate(stats):
+    return stats["errors"] / stats["requests"] * 100 if stats["requests"] else 0.0
+
+
+def compare(baseline, candidate, threshold, latency_key="p95_ms", error_threshold=1.0):
+    """[(route, metric, before, after, change %, regressed)] for routes present in both runs."""
+    rows = []
+    routes = {"total": (baseline["total"], candidate["total"])}
+    for route, stats in baseline["routes"].items():
+        if route in candidate["routes"]:
+            routes[route] = (stats, candidate["routes"][route])
+
+    for route, (before, after) in routes.items():
+        if min(before["requests"], after["requests"]) < MIN_REQUESTS:
+            continue
+        latency = change(before[latency_key], after[latency_key])
+        throughput = change(before["throughput_rps"], after["throughput_rps"])
+        rows.append((route, latency_key, before[latency_key], after[latency_key], latency, latency > threshold))
+        rows.append((
+            route, "throughput_rps", before["throughput_rps"], after["throughput_rps"],
+            throughput, throughput < -threshold
+        ))
+        # a single extra 5xx in a long run is noise, a rising rate is not
+        errors = error_rate(after) - error_rate(before)
+        rows.append((
+            route, "error_rate_%", error_rate(before), error_rate(after), errors, errors > error_threshold
+        ))
+    return rows
+
+
+def print_comparison(rows, baseline, candidate):
+    print("=" * 86)
+    print(f"baseline:  {baseline['meta']['started_at']}  scale {baseline['meta']['scale']}")
+    print(f"candidate: {candidate['meta']['started_at']}  scale {candidate['meta']['scale']}")
+    print(f"           {baseline['meta']['workload']} vs {candidate['meta']['workload']} workload, "
+          f"{baseline['meta']['clients']} vs {candidate['meta']['clients']} clients")
+    if baseline["meta"]["scale"] != candidate["meta"]["scale"]:
+        print("WARNING: the runs used different data scales")
+    if baseline["meta"]["workload"] != candidate["meta"]["workload"]:
+        print("WARNING: the runs used different workloads")
+    if baseline["meta"]["clients"] != candidate["meta"]["clients"]:
+        print("WARNING: the runs used different client counts")
+    print("=" * 86)
+    print(f"{'route':<44}{'metric':<16}{'before':>9}{'after':>9}{'change':>8}")
+    for route, metric, before, after, pct, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{route:<44}{metric:<16}{before:>9.1f}{after:>9.1f}{pct:>+7.1f}%{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark results")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed change in percent")
+    parser.add_argument("--p99", action="store_true", help="judge latency by p99 instead of p95")
+    parser.add_argument(
+        "--error-threshold", type=float, default=1.0,
+        help="allowed rise of the error rate, in percentage points"
+    )
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    rows = compare(
+        baseline, candidate, args.threshold, "p99_ms" if args.p99 else "p95_ms", args.error_threshold
+    )
+    print_comparison(rows, baseline, candidate)
+
+    regressions = sum(row[-1] for row in rows)
+    print(f"\n{regressions} regression(s)" if regressions else "\nNo regressions.")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
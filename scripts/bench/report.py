@@ -0,0 +1,95 @@
+# report.py
+# Per-route latency/throughput summaries for run.py, and the JSON they are saved as.
+import json
+from collections import Counter, defaultdict
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class Recorder:
+    """Collects one (route, status, seconds) sample per request."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.recording = True
+
+    def add(self, route, status, seconds):
+        if not self.recording:
+            return
+        self.statuses[route][status] += 1
+        # failed requests are counted, but their (often instant) latency is not
+        if isinstance(status, int) and status < 500:
+            self.latencies[route].append(seconds)
+
+    def summary(self, latencies, statuses, elapsed):
+        ok = sum(count for status, count in statuses.items() if isinstance(status, int) and status < 400)
+        client_errors = sum(
+            count for status, count in statuses.items() if isinstance(status, int) and 400 <= status < 500
+        )
+        total = sum(statuses.values())
+        return {
+            "requests": total,
+            "ok": ok,
+            "client_errors": client_errors,
+            "errors": total - ok - client_errors,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        }
+
+    def report(self, meta, elapsed):
+        everything, statuses = [], Counter()
+        for route in self.statuses:
+            everything.extend(self.latencies[route])
+            statuses.update(self.statuses[route])
+        return {
+            "meta": {**meta, "elapsed_s": round(elapsed, 2)},
+            "total": self.summary(everything, statuses, elapsed),
+            "routes": {
+                route: self.summary(self.latencies[route], self.statuses[route], elapsed)
+                for route in sorted(self.statuses)
+            },
+        }
+
+
+def print_report(report):
+    meta, total = report["meta"], report["total"]
+    print("=" * 78)
+    print(
+        f"{meta['workload']} workload, {meta['clients']} clients, {meta['elapsed_s']}s "
+        f"against {meta['base_url']} (db_mode={meta['db_mode']})"
+    )
+    print("Scale: " + ", ".join(f"{table}={count}" for table, count in meta["scale"].items()))
+    print("=" * 78)
+    print(f"{'route':<44}{'req/s':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'err':>6}")
+    for route, stats in report["routes"].items():
+        print(
+            f"{route:<44}{stats['throughput_rps']:>8.1f}{stats['p50_ms']:>8.1f}"
+            f"{stats['p95_ms']:>8.1f}{stats['p99_ms']:>8.1f}{stats['errors']:>6}"
+        )
+    print("-" * 78)
+    print(
+        f"{'total':<44}{total['throughput_rps']:>8.1f}{total['p50_ms']:>8.1f}"
+        f"{total['p95_ms']:>8.1f}{total['p99_ms']:>8.1f}{total['errors']:>6}"
+    )
+
+
+def save(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {path}")
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
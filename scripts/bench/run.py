@@ -0,0 +1,199 @@
+# run.py
+# HTTP load generator: closed-loop asyncio clients over a weighted workload.
+#
+#   uvicorn app.main:app --port 8000            (or DB_MODE=async ...)
+#   python scripts/bench/run.py --workload mixed --clients 100 --duration 30 \
+#       --scale 100000 --output bench/mixed-sync.json
+#   python scripts/bench/compare.py bench/mixed-sync.json bench/mixed-async.json
+#
+# --scale tops the database up (through the bulk endpoints) to that many
+# events, a tenth as many correspondents and one reportage per event, so
+# runs on different days compare like with like. The counts are recorded in
+# the JSON either way; they come from count(*) over DATABASE_URL (the
+# server's database), not from the API under test. --baseline compares the new
+# result to an older one.
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.database import engine
+from compare import compare, print_comparison
+from report import Recorder, load, print_report, save
+from workloads import WORKLOADS, Pools, choose, new_event, new_reportage
+
+API_PORT = os.environ.get("API_PORT", "8000")
+BASE_URL = os.environ.get("API_URL", f"http://localhost:{API_PORT}")
+
+SEED_BATCH = 5000
+POOL_SIZE = 1000
+
+
+COUNT_ROWS = text("""
+    SELECT (SELECT count(*) FROM events) AS events,
+           (SELECT count(*) FROM correspondent) AS correspondents,
+           (SELECT count(*) FROM reportage) AS reportages
+""")
+
+
+def count_rows():
+    """Current table sizes, counted in the database rather than pulled through the API."""
+    with engine.connect() as connection:
+        return dict(connection.execute(COUNT_ROWS).mappings().one())
+
+
+async def bulk(client, path, items):
+    body = "\n".join(json.dumps(item) for item in items)
+    response = await client.post(path, content=body, headers={"Content-Type": "application/x-ndjson"})
+    response.raise_for_status()
+    return [created["id"] for created in response.json()["created"]]
+
+
+async def top_up(client, path, missing, make):
+    ids = []
+    while missing > 0:
+        batch = min(missing, SEED_BATCH)
+        ids += await bulk(client, path, [make() for _ in range(batch)])
+        missing -= batch
+    return ids
+
+
+async def seed(client, scale, rng):
+    """Top the tables up to scale; returns the row counts after seeding."""
+    counts = await asyncio.to_thread(count_rows)
+    print(f"Current rows: {counts}")
+    started = time.perf_counter()
+
+    targets = {"events": scale, "correspondents": scale // 10, "reportages": scale}
+    await top_up(client, "/events/bulk", scale - counts["events"], lambda: new_event(rng))
+    await top_up(client, "/correspondents/bulk", scale // 10 - counts["correspondents"], lambda: {
+        "name": f"Correspondent {rng.randint(1, 10**6)}",
+        "country": "Armenia",
+        "city": rng.choice(["Yerevan", "Gyumri", "Vanadzor"]),
+        "specification": rng.choice(["politics", "culture", "sport"]),
+        "operator": rng.random() < 0.1,
+        "price": round(rng.uniform(50, 5000), 2),
+    })
+    pools = await load_pools(client)
+    await top_up(client, "/reportages/bulk", scale - counts["reportages"], lambda: new_reportage(pools, rng))
+    print(f"Seeded to scale {scale} in {time.perf_counter() - started:.1f}s")
+    return {table: max(counts[table], target) for table, target in targets.items()}
+
+
+async def load_pools(client):
+    async def ids(path):
+        return [row["id"] for row in (await client.get(path, params={"limit": POOL_SIZE})).json()] or [1]
+
+    return Pools(
+        events=await ids("/events/"),
+        correspondents=await ids("/correspondents/"),
+        reportages=await ids("/reportages/"),
+    )
+
+
+async def client_loop(client, ops, pools, rng, deadline, recorder):
+    while time.perf_counter() < deadline:
+        op, request = choose(ops, pools, rng)
+        if op is None:
+            await asyncio.sleep(0.01)
+            continue
+        method, url, body = request
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, json=body)
+            status = response.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        recorder.add(op.name, status, time.perf_counter() - started)
+        if op.name == "POST /events/" and status == 200:
+            pools.created_events.append(response.json()["id"])
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        root = (await client.get("/")).json()
+        if args.scale:
+            scale = await seed(client, args.scale, rng)
+        else:
+            scale = await asyncio.to_thread(count_rows)
+        pools = await load_pools(client)
+
+        ops = WORKLOADS[args.workload]
+        recorder = Recorder()
+        print(f"Server: {args.url} (db_mode={root.get('db_mode', '?')}), scale {scale}")
+        print(f"Workload {args.workload}: {args.clients} clients, {args.warmup}s warmup + {args.duration}s")
+
+        # clients keep going through the warmup; only the measured window is recorded
+        recorder.recording = False
+        deadline = time.perf_counter() + args.warmup + args.duration
+        clients = [
+            asyncio.create_task(client_loop(
+                client, ops, pools, random.Random(rng.random()), deadline, recorder
+            ))
+            for _ in range(args.clients)
+        ]
+        await asyncio.sleep(args.warmup)
+        recorder.recording = True
+        started = time.perf_counter()
+        await asyncio.gather(*clients)
+        elapsed = time.perf_counter() - started
+
+    meta = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "base_url": args.url,
+        "db_mode": root.get("db_mode"),
+        "workload": args.workload,
+        "clients": args.clients,
+        "duration_s": args.duration,
+        "seed": args.seed,
+        "scale": scale,
+    }
+    return recorder.report(meta, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP load benchmark")
+    parser.add_argument("--url", default=BASE_URL)
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="mixed")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=int, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured seconds before that")
+    parser.add_argument("--scale", type=int, help="top the database up to this many events first")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the request mix")
+    parser.add_argument("--output", help="write the JSON result here")
+    parser.add_argument("--baseline", help="compare against an earlier JSON result")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    parser.add_argument(
+        "--error-threshold", type=float, default=1.0,
+        help="allowed rise of the error rate, in percentage points"
+    )
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        save(report, args.output)
+
+    if args.baseline:
+        baseline = load(args.baseline)
+        rows = compare(baseline, report, args.threshold, error_threshold=args.error_threshold)
+        print()
+        print_comparison(rows, baseline, report)
+        if any(row[-1] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
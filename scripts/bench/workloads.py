@@ -0,0 +1,152 @@
+# workloads.py
+# Weighted request mixes for run.py.
+#
+# Each operation builds one request from the shared id pools, or returns
+# None when it cannot run yet (e.g. nothing to delete), in which case the
+# client simply picks another operation.
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+CITIES = ["Yerevan", "Gyumri", "Vanadzor", "Dilijan", "Ashtarak"]
+DANGERS = ["low", "medium", "high"]
+TYPES = ["protest", "concert", "exhibition", "sport", "conference"]
+
+
+@dataclass
+class Pools:
+    """Ids the workload may reference; `created_events` are the bench's own rows."""
+    events: list
+    correspondents: list
+    reportages: list
+    created_events: list = field(default_factory=list)
+
+
+@dataclass
+class Op:
+    name: str
+    weight: int
+    build: Callable[[Pools, random.Random], Optional[tuple]]
+
+
+def new_event(rng):
+    return {
+        "place": rng.choice(["Central Square", "Opera Theater", "Cascade"]),
+        "city": rng.choice(CITIES),
+        "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "duration": rng.randint(30, 240),
+        "danger": rng.choice(DANGERS),
+        "type": rng.choice(TYPES),
+        "extra_metadata": {"attendance": rng.randint(50, 5000), "organizer": f"Org_{rng.randint(1, 100)}"},
+    }
+
+
+def new_reportage(pools, rng):
+    return {
+        "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "quality": rng.choice(["HD", "FullHD", "4K"]),
+        "time": f"{rng.randint(8, 20):02d}:{rng.randint(0, 59):02d}",
+        "video": rng.random() < 0.5,
+        "event_id": rng.choice(pools.events),
+        "correspondent_id": rng.choice(pools.correspondents),
+    }
+
+
+def get(path):
+    return lambda pools, rng: ("GET", path, None)
+
+
+def get_by_id(path, pool):
+    return lambda pools, rng: ("GET", path.replace("{id}", str(rng.choice(getattr(pools, pool)))), None)
+
+
+def create_event(pools, rng):
+    return "POST", "/events/", new_event(rng)
+
+
+def update_event(pools, rng):
+    if not pools.created_events:
+        return None
+    return "PUT", f"/events/{rng.choice(pools.created_events)}", new_event(rng)
+
+
+def delete_event(pools, rng):
+    # only rows the bench created: they have no reportages pointing at them
+    if not pools.created_events:
+        return None
+    event_id = pools.created_events.pop(rng.randrange(len(pools.created_events)))
+    return "DELETE", f"/events/{event_id}", None
+
+
+def create_reportage(pools, rng):
+    return "POST", "/reportages/", new_reportage(pools, rng)
+
+
+def stats_filter(pools, rng):
+    city, danger = rng.choice(CITIES), rng.choice(DANGERS)
+    return "GET", f"/queries/events_by_city_and_danger?city={city}&danger_level={danger}&min_duration=200", None
+
+
+def fulltext(pools, rng):
+    return "GET", f"/queries/fulltext_search_events?q=Org_{rng.randint(1, 100)}&total=estimate", None
+
+
+def regex(pools, rng):
+    return "GET", f"/queries/regex_search_events?pattern=note%20%23{rng.randint(10, 99)}[0-9]{{3}}$", None
+
+
+def ranked(pools, rng):
+    return "GET", f"/queries/search_events?q={rng.choice(TYPES)}%20{rng.choice(CITIES)}", None
+
+
+READ_OPS = [
+    Op("GET /events/", 10, get("/events/?limit=20")),
+    Op("GET /events/{id}", 20, get_by_id("/events/{id}", "events")),
+    Op("GET /correspondents/", 5, get("/correspondents/?limit=20")),
+    Op("GET /correspondents/{id}", 5, get_by_id("/correspondents/{id}", "correspondents")),
+    Op("GET /reportages/", 5, get("/reportages/?limit=20")),
+    Op("GET /reportages/{id}", 5, get_by_id("/reportages/{id}", "reportages")),
+]
+
+JOIN_AGGREGATE_OPS = [
+    Op("GET /queries/reportages_with_details", 8, get("/queries/reportages_with_details?limit=20")),
+    Op("GET /queries/events_stats_by_city", 8, get("/queries/events_stats_by_city")),
+    Op("GET /queries/events_stats_by_city?fresh", 1, get("/queries/events_stats_by_city?fresh=true")),
+    Op("GET /queries/sorted_events", 6, get("/queries/sorted_events?sort_by=date&limit=20")),
+    Op("GET /queries/events_by_city_and_danger", 6, stats_filter),
+    Op("GET /reportages/?expand", 4, get("/reportages/?limit=20&expand=event,correspondent")),
+    Op("GET /queries/top_correspondents", 4, get("/queries/top_correspondents?by=spend")),
+]
+
+SEARCH_OPS = [
+    Op("GET /queries/fulltext_search_events", 4, fulltext),
+    Op("GET /queries/regex_search_events", 2, regex),
+    Op("GET /queries/search_events", 4, ranked),
+    Op("GET /queries/events_by_metadata", 3, get("/queries/events_by_metadata?filter=attendance:gt:4900&limit=20")),
+]
+
+WRITE_OPS = [
+    Op("POST /events/", 4, create_event),
+    Op("PUT /events/{id}", 2, update_event),
+    Op("DELETE /events/{id}", 2, delete_event),
+    Op("POST /reportages/", 3, create_reportage),
+]
+
+WORKLOADS = {
+    # what scripts/bench_async.py used to run
+    "read": READ_OPS + JOIN_AGGREGATE_OPS[:4],
+    "mixed": READ_OPS + JOIN_AGGREGATE_OPS + SEARCH_OPS + WRITE_OPS,
+    "search": SEARCH_OPS,
+    "write": WRITE_OPS + [Op("GET /events/{id}", 4, get_by_id("/events/{id}", "events"))],
+}
+
+
+def choose(ops, pools, rng):
+    """(op, request) for the next request, skipping operations that cannot run now."""
+    weights = [op.weight for op in ops]
+    for _ in range(10):
+        op = rng.choices(ops, weights)[0]
+        request = op.build(pools, rng)
+        if request is not None:
+            return op, request
+    return None, None
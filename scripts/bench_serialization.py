@@ -0,0 +1,92 @@
+# bench_serialization.py
+# Micro-benchmark of the event list response path, without a database.
+#
+# "before": ORM Event instances validated through response_model
+#           (List[EventResponse]) and rendered by the stock JSONResponse,
+#           which is what GET /events/ used to do per page.
+# "after":  column-tuple rows turned into dicts and rendered by orjson
+#           (app/serialization.py), what the list handlers do now.
+#
+# Both paths start from the raw tuples a cursor returns, so ORM instance
+# construction is part of "before" and Row construction part of "after".
+#
+#   python scripts/bench_serialization.py --sizes 100 10000
+import argparse
+import asyncio
+import datetime
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy.engine import result
+
+from app import models, schemas
+from app.serialization import EVENT_ROWS, FastJSONResponse, row_dicts
+
+KEYS = list(EVENT_ROWS.selected_columns.keys())
+RESPONSE_FIELD = create_model_field(name="Response_read_events", type_=List[schemas.EventResponse])
+LOOP = asyncio.new_event_loop()
+
+
+def raw_rows(count):
+    return [
+        (
+            i, "Republic Square", "Yerevan", datetime.date(2024, 1, 1) + datetime.timedelta(days=i % 730),
+            30 + i % 211, "medium", "concert",
+            {"attendance": 50 + i % 4951, "organizer": f"Org_{i % 100}", "notes": f"Event note #{i}"},
+        )
+        for i in range(count)
+    ]
+
+
+def before(data):
+    events = [models.Event(**dict(zip(KEYS, row))) for row in data]
+    content = LOOP.run_until_complete(
+        serialize_response(field=RESPONSE_FIELD, response_content=events)
+    )
+    return JSONResponse(content).body
+
+
+def after(data):
+    rows = result.IteratorResult(result.SimpleResultMetaData(KEYS), iter(data)).all()
+    return FastJSONResponse(row_dicts(rows)).body
+
+
+def measure(fn, data, min_seconds):
+    runs, started = 0, time.perf_counter()
+    while True:
+        body = fn(data)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return runs * len(data) / elapsed, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event list serialization benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000], help="rows per response")
+    parser.add_argument("--seconds", type=float, default=2.0, help="minimum time per measurement")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Event list serialization")
+    print("=" * 60)
+    for size in args.sizes:
+        data = raw_rows(size)
+        assert before(data) == after(data), "paths render different JSON"
+        before_rate, before_bytes = measure(before, data, args.seconds)
+        after_rate, after_bytes = measure(after, data, args.seconds)
+        print(f"{size} rows/response:")
+        print(f"   before: {before_rate:12,.0f} rows/s  ({before_bytes} bytes)")
+        print(f"   after:  {after_rate:12,.0f} rows/s  ({after_bytes} bytes)")
+        print(f"   speedup: {after_rate / before_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,32 @@
-import requests
+# fill_db.py
+# Seeds the database through the HTTP API, so it also exercises the write path.
+#
+#   python scripts/fill_db.py                                   (20/15/30 rows)
+#   python scripts/fill_db.py --events 20000 --correspondents 2000 \
+#       --reportages 50000 --concurrency 64
+#
+# One keep-alive AsyncClient, --concurrency workers pulling jobs in order:
+# events and correspondents are queued first and each reportage waits only
+# for the two rows it references, so reportages start as soon as their
+# parents exist. Timeouts, connection errors and 429/502/503/504 responses
+# are retried with backoff. The summary doubles as a write-path load test.
+import argparse
+import asyncio
 import random
+import time
+from collections import Counter
 from datetime import datetime, timedelta
 
+import httpx
 import os
 from dotenv import load_dotenv
 
+load_dotenv()
 
 API_PORT = os.environ.get("API_PORT", "8000")
-BASE_URL = f"http://localhost:{API_PORT}"
+BASE_URL = os.environ.get("API_URL", f"http://localhost:{API_PORT}")
+
+RETRY_STATUSES = {429, 502, 503, 504}
 
 cities = ["Yerevan", "Gyumri", "Vanadzor", "Dilijan", "Ashtarak"]
 places = ["Central Square", "Opera Theater", "Republic Square", "Cascade", "Sports Complex"]
@@ -15,114 +34,184 @@ danger_levels = ["low", "medium", "high"]
 event_types = ["protest", "concert", "exhibition", "sport", "conference"]
 qualities = ["HD", "FullHD", "4K"]
 
-def create_event():
-    """Создать случайное событие"""
-    event_data = {
-        "place": random.choice(places),
-        "city": random.choice(cities),
-        "date": (datetime.now() + timedelta(days=random.randint(1, 30))).strftime("%Y-%m-%d"),
-        "duration": random.randint(30, 240),
-        "danger": random.choice(danger_levels),
-        "type": random.choice(event_types),
+
+def event_data(rng):
+    """Случайное событие"""
+    return {
+        "place": rng.choice(places),
+        "city": rng.choice(cities),
+        "date": (datetime.now() + timedelta(days=rng.randint(1, 30))).strftime("%Y-%m-%d"),
+        "duration": rng.randint(30, 240),
+        "danger": rng.choice(danger_levels),
+        "type": rng.choice(event_types),
         "extra_metadata": {
-            "attendance": random.randint(50, 5000),
-            "organizer": f"Org_{random.randint(1, 100)}",
-            "notes": f"Event note #{random.randint(1, 1000)}",
-            "priority": random.choice(["low", "medium", "high"])
+            "attendance": rng.randint(50, 5000),
+            "organizer": f"Org_{rng.randint(1, 100)}",
+            "notes": f"Event note #{rng.randint(1, 1000)}",
+            "priority": rng.choice(["low", "medium", "high"])
         }
     }
-    
-    response = requests.post(f"{BASE_URL}/events/", json=event_data)
-    if response.status_code in [200, 201]:
-        return response.json()["id"]
-    else:
-        print(f"Error creating event: {response.status_code} - {response.text[:100]}")
-        return None
 
-def create_correspondent():
-    """Создать случайного корреспондента"""
+
+def correspondent_data(rng):
+    """Случайный корреспондент"""
     names = ["Anna", "John", "Maria", "David", "Sophia", "Michael", "Elena", "Alex"]
     surnames = ["Smith", "Johnson", "Brown", "Wilson", "Taylor", "Clark", "Lee", "Walker"]
-    
-    correspondent_data = {
-        "name": f"{random.choice(names)} {random.choice(surnames)}",
+    return {
+        "name": f"{rng.choice(names)} {rng.choice(surnames)}",
         "country": "Armenia",
-        "city": random.choice(cities),
-        "specification": random.choice(["war", "politics", "culture", "sport", "economics"]),
-        "operator": random.choice([True, False]),
-        "price": round(random.uniform(50.0, 500.0), 2)
+        "city": rng.choice(cities),
+        "specification": rng.choice(["war", "politics", "culture", "sport", "economics"]),
+        "operator": rng.choice([True, False]),
+        "price": round(rng.uniform(50.0, 500.0), 2)
     }
-    
-    response = requests.post(f"{BASE_URL}/correspondents/", json=correspondent_data)
-    if response.status_code in [200, 201]:
-        return response.json()["id"]
-    else:
-        print(f"Error creating correspondent: {response.status_code} - {response.text[:100]}")
-        return None
 
-def create_reportage(event_id, correspondent_id):
-    """Создать репортаж"""
-    reportage_data = {
-        "date": (datetime.now() - timedelta(days=random.randint(1, 10))).strftime("%Y-%m-%d"),
-        "quality": random.choice(qualities),
-        "time": f"{random.randint(8, 22)}:{random.randint(0, 59):02d}",
-        "video": random.choice([True, False]),
-        "event_id": event_id,
-        "correspondent_id": correspondent_id
+
+def reportage_data(rng):
+    """Репортаж (event_id / correspondent_id are added once the parents exist)"""
+    return {
+        "date": (datetime.now() - timedelta(days=rng.randint(1, 10))).strftime("%Y-%m-%d"),
+        "quality": rng.choice(qualities),
+        "time": f"{rng.randint(8, 22):02d}:{rng.randint(0, 59):02d}",
+        "video": rng.choice([True, False]),
     }
-    
-    response = requests.post(f"{BASE_URL}/reportages/", json=reportage_data)
-    if response.status_code in [200, 201]:
-        return response.json()["id"]
-    else:
-        print(f"Error creating reportage: {response.status_code} - {response.text[:200]}")
+
+
+class Filler:
+    def __init__(self, client, retries):
+        self.client = client
+        self.retries = retries
+        self.requests = Counter()
+        self.created = Counter()
+        self.retried = 0
+        self.failures = Counter()
+
+    async def post(self, kind, path, body):
+        """POST with retries on transient failures; the new id, or None."""
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.retried += 1
+                await asyncio.sleep(0.1 * 2 ** attempt * random.uniform(0.5, 1.5))
+            self.requests[kind] += 1
+            try:
+                response = await self.client.post(path, json=body)
+            except httpx.TransportError as e:
+                error = type(e).__name__
+                continue
+            if response.status_code in RETRY_STATUSES:
+                error = response.status_code
+                continue
+            if response.status_code in (200, 201):
+                self.created[kind] += 1
+                return response.json()["id"]
+            error = response.status_code
+            break
+        self.failures[kind, error] += 1
         return None
 
+
+async def worker(queue, filler):
+    while True:
+        job = await queue.get()
+        try:
+            await job()
+        except Exception as e:
+            # e.g. a 200 without a JSON id; a dead worker would leave queue.join() hanging
+            filler.failures["job", type(e).__name__] += 1
+        finally:
+            queue.task_done()
+
+
+async def progress(filler, started):
+    while True:
+        await asyncio.sleep(1)
+        elapsed = time.perf_counter() - started
+        print(
+            f"\r   {dict(filler.created)}  {sum(filler.requests.values()) / elapsed:,.0f} req/s",
+            end="", flush=True
+        )
+
+
+async def fill(args):
+    rng = random.Random(args.seed)
+    loop = asyncio.get_running_loop()
+    events = [loop.create_future() for _ in range(args.events)]
+    correspondents = [loop.create_future() for _ in range(args.correspondents)]
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        filler = Filler(client, args.retries)
+
+        def create(kind, path, body, future):
+            async def job():
+                try:
+                    future.set_result(await filler.post(kind, path, body))
+                finally:
+                    # reportages waiting on this row must not hang
+                    if not future.done():
+                        future.set_result(None)
+            return job
+
+        # the body is drawn from rng when queued (workers run jobs in any
+        # order), so --seed reproduces it; only the parent ids arrive later
+        def create_reportage(body, event, correspondent):
+            async def job():
+                event_id, correspondent_id = await event, await correspondent
+                if event_id is None or correspondent_id is None:
+                    filler.failures["reportages", "missing parent"] += 1
+                    return
+                await filler.post("reportages", "/reportages/", {
+                    **body, "event_id": event_id, "correspondent_id": correspondent_id
+                })
+            return job
+
+        queue = asyncio.Queue()
+        for future in events:
+            queue.put_nowait(create("events", "/events/", event_data(rng), future))
+        for future in correspondents:
+            queue.put_nowait(create("correspondents", "/correspondents/", correspondent_data(rng), future))
+        if events and correspondents:
+            for _ in range(args.reportages):
+                queue.put_nowait(create_reportage(
+                    reportage_data(rng), rng.choice(events), rng.choice(correspondents)
+                ))
+
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(worker(queue, filler)) for _ in range(args.concurrency)]
+        reporter = asyncio.create_task(progress(filler, started))
+        await queue.join()
+        elapsed = time.perf_counter() - started
+        for task in tasks + [reporter]:
+            task.cancel()
+    return filler, elapsed
+
+
 def main():
-    print("Starting to fill database with sample data...")
-    
-    # 20 events 
-    event_ids = []
-    for i in range(20):
-        print(f"Creating event {i+1}/20...")
-        event_id = create_event()
-        if event_id:
-            event_ids.append(event_id)
-        else:
-            print("  Skipping...")
-    
-    # 15 correspondents
-    correspondent_ids = []
-    for i in range(15):
-        print(f"Creating correspondent {i+1}/15...")
-        correspondent_id = create_correspondent()
-        if correspondent_id:
-            correspondent_ids.append(correspondent_id)
-        else:
-            print("  Skipping...")
-    
-    print(f"\nCreated {len(event_ids)} events and {len(correspondent_ids)} correspondents")
-    
-    created_reportages = 0
-
-    if event_ids and correspondent_ids:
-        reportage_count = min(30, len(event_ids) * len(correspondent_ids))
-        print(f"Creating {reportage_count} reportages...")
-        
-        created_reportages = 0
-        for i in range(reportage_count):
-            print(f"Creating reportage {i+1}/{reportage_count}...")
-            event_id = random.choice(event_ids)
-            correspondent_id = random.choice(correspondent_ids)
-            
-            if create_reportage(event_id, correspondent_id):
-                created_reportages += 1
-    else:
-        print("Cannot create reportages - missing events or correspondents")
-    
-    print(f"\n✅ Database filling completed!")
-    print(f"Created: {len(event_ids)} events, {len(correspondent_ids)} correspondents, {created_reportages} reportages")
-    print(f"API available at: {BASE_URL}/docs")
+    parser = argparse.ArgumentParser(description="Seed the database through the API")
+    parser.add_argument("--url", default=BASE_URL)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--correspondents", type=int, default=15)
+    parser.add_argument("--reportages", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--retries", type=int, default=3, help="retries per request on transient failures")
+    parser.add_argument("--seed", type=int, help="random seed for the generated rows")
+    args = parser.parse_args()
+
+    print(f"Filling {args.url}: {args.events} events, {args.correspondents} correspondents, "
+          f"{args.reportages} reportages, {args.concurrency} concurrent requests")
+    filler, elapsed = asyncio.run(fill(args))
+
+    requests = sum(filler.requests.values())
+    print(f"\r✅ Database filling completed in {elapsed:.1f}s" + " " * 40)
+    print(f"Created: {filler.created['events']} events, {filler.created['correspondents']} correspondents, "
+          f"{filler.created['reportages']} reportages")
+    print(f"Requests: {requests} ({requests / elapsed:,.0f} req/s), {filler.retried} retried")
+    for kind, count in filler.requests.items():
+        print(f"   {kind}: {count} requests, {count / elapsed:,.0f} req/s")
+    for (kind, error), count in sorted(filler.failures.items(), key=str):
+        print(f"   failed {kind}: {count} x {error}")
+    print(f"API available at: {args.url}/docs")
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,57 @@
+# manage_partitions.py
+# Partition maintenance for reportage, meant for a daily cron job:
+# creates the upcoming monthly partitions and, with --retain-months,
+# detaches and drops the ones entirely older than the retention window.
+#
+#   python scripts/manage_partitions.py --ahead 3
+#   python scripts/manage_partitions.py --retain-months 24 --dry-run
+#   python scripts/manage_partitions.py --retain-months 24 --keep-detached
+#
+# Dropping a partition is a catalog operation, not a DELETE: it takes a
+# brief lock on reportage (bounded by --lock-timeout-ms) and subtracts the
+# partition's rows from the reportage counters. --keep-detached leaves the
+# detached table in place for archiving (pg_dump -t reportage_p2023_01).
+import argparse
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import engine
+from app.partitions import PARTITIONS_AHEAD, add_months, detach_partition, ensure_upcoming, expired_partitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create upcoming and drop expired reportage partitions")
+    parser.add_argument("--ahead", type=int, default=PARTITIONS_AHEAD, help="months to prepare beyond this one")
+    parser.add_argument("--retain-months", type=int, help="drop partitions older than this many months")
+    parser.add_argument("--keep-detached", action="store_true", help="detach expired partitions without dropping")
+    parser.add_argument("--lock-timeout-ms", type=int, default=5000)
+    parser.add_argument("--dry-run", action="store_true", help="only print what would change")
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        if args.dry_run:
+            print("Dry run: no changes")
+        else:
+            created = ensure_upcoming(connection, args.ahead)
+            connection.commit()
+            print(f"Created {created} upcoming partition(s)")
+
+        if args.retain_months is None:
+            return
+        cutoff = add_months(date.today(), -args.retain_months)
+        expired = expired_partitions(connection, cutoff)
+
+    print(f"{len(expired)} partition(s) entirely before {cutoff}")
+    for name in expired:
+        if args.dry_run:
+            print(f"   would {'detach' if args.keep_detached else 'drop'} {name}")
+            continue
+        rows = detach_partition(engine, name, args.keep_detached, args.lock_timeout_ms)
+        print(f"   {'detached' if args.keep_detached else 'dropped'} {name} ({rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
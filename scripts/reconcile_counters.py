@@ -0,0 +1,44 @@
+# reconcile_counters.py
+# Repairs drift in the denormalized events/correspondent.reportage_count
+# columns, e.g. from cron after loads that bypass triggers.
+#
+#   python scripts/reconcile_counters.py            (fix and report)
+#   python scripts/reconcile_counters.py --dry-run  (report only, roll back)
+#
+# Exits 1 when anything had drifted, so a monitoring job can alert on it.
+# A running API also serves POST /admin/reportage_counts/reconcile, which
+# additionally drops the cached leaderboards.
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.counters import reconcile_counters
+from app.database import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile reportage counters")
+    parser.add_argument("--dry-run", action="store_true", help="report drift without fixing it")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        repaired = reconcile_counters(db)
+        if args.dry_run:
+            db.rollback()
+        else:
+            db.commit()
+
+    verb = "drifted" if args.dry_run else "repaired"
+    for table, ids in repaired.items():
+        sample = f" (e.g. ids {', '.join(map(str, sorted(ids)[:10]))})" if ids else ""
+        print(f"{table}: {len(ids)} counters {verb}{sample}")
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+    sys.exit(1 if any(repaired.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()